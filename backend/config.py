@@ -21,7 +21,10 @@ Usage:
 """
 
 import os
-from typing import Optional
+import sys
+from functools import lru_cache
+from types import MappingProxyType, SimpleNamespace
+from typing import Mapping, Optional
 
 # =============================================================================
 # Core Database Configuration
@@ -50,10 +53,19 @@ SCHEMA_RAW = "RAW"
 # Helper Functions
 # =============================================================================
 
+@lru_cache(maxsize=512)
+def _default_path(schema: str, table: str) -> str:
+    """Fully qualified path in the configured DB, memoized and interned."""
+    return sys.intern(f"{DB}.{schema}.{table}")
+
+
 def get_table_path(schema: str, table: str, database: Optional[str] = None) -> str:
     """
     Get fully qualified table path.
     
+    Lookups against the default database go through a memoized, interned
+    fast path; an explicit database override is formatted directly.
+    
     Args:
         schema: Schema name (e.g., "PRODUCTION", "APPLICATIONS")
         table: Table or view name
@@ -62,8 +74,9 @@ def get_table_path(schema: str, table: str, database: Optional[str] = None) -> s
     Returns:
         Fully qualified path like "FLUX_DB.PRODUCTION.TRANSFORMER_METADATA"
     """
-    db = database or DB
-    return f"{db}.{schema}.{table}"
+    if database is None:
+        return _default_path(schema, table)
+    return f"{database}.{schema}.{table}"
 
 
 def get_production_table(table: str) -> str:
@@ -90,49 +103,56 @@ def get_cascade_table(table: str) -> str:
 # Common Table References (for autocomplete and consistency)
 # =============================================================================
 
-class Tables:
-    """Common table references for IDE autocomplete."""
-    
+# (attribute name, schema, table) - attribute name matches the table name
+# except where a shorter alias is used (e.g. SERVICE_AREAS_MV).
+_TABLE_SPECS = [
     # PRODUCTION tables
-    TRANSFORMER_METADATA = get_production_table("TRANSFORMER_METADATA")
-    SUBSTATIONS = get_production_table("SUBSTATIONS")
-    CIRCUIT_METADATA = get_production_table("CIRCUIT_METADATA")
-    METER_INFRASTRUCTURE = get_production_table("METER_INFRASTRUCTURE")
-    AMI_INTERVAL_READINGS = get_production_table("AMI_INTERVAL_READINGS")
-    TRANSFORMER_HOURLY_LOAD = get_production_table("TRANSFORMER_HOURLY_LOAD")
-    HOUSTON_WEATHER_HOURLY = get_production_table("HOUSTON_WEATHER_HOURLY")
-    WORK_ORDERS = get_production_table("WORK_ORDERS")
-    OUTAGE_RESTORATION_TRACKER = get_production_table("OUTAGE_RESTORATION_TRACKER")
-    GRID_POLES_INFRASTRUCTURE = get_production_table("GRID_POLES_INFRASTRUCTURE")
+    ("TRANSFORMER_METADATA", SCHEMA_PRODUCTION, "TRANSFORMER_METADATA"),
+    ("SUBSTATIONS", SCHEMA_PRODUCTION, "SUBSTATIONS"),
+    ("CIRCUIT_METADATA", SCHEMA_PRODUCTION, "CIRCUIT_METADATA"),
+    ("METER_INFRASTRUCTURE", SCHEMA_PRODUCTION, "METER_INFRASTRUCTURE"),
+    ("AMI_INTERVAL_READINGS", SCHEMA_PRODUCTION, "AMI_INTERVAL_READINGS"),
+    ("TRANSFORMER_HOURLY_LOAD", SCHEMA_PRODUCTION, "TRANSFORMER_HOURLY_LOAD"),
+    ("HOUSTON_WEATHER_HOURLY", SCHEMA_PRODUCTION, "HOUSTON_WEATHER_HOURLY"),
+    ("WORK_ORDERS", SCHEMA_PRODUCTION, "WORK_ORDERS"),
+    ("OUTAGE_RESTORATION_TRACKER", SCHEMA_PRODUCTION, "OUTAGE_RESTORATION_TRACKER"),
+    ("GRID_POLES_INFRASTRUCTURE", SCHEMA_PRODUCTION, "GRID_POLES_INFRASTRUCTURE"),
     
     # APPLICATIONS views
-    FLUX_OPS_CENTER_KPIS = get_applications_table("FLUX_OPS_CENTER_KPIS")
-    FLUX_OPS_CENTER_TOPOLOGY = get_applications_table("FLUX_OPS_CENTER_TOPOLOGY")
-    FLUX_OPS_CENTER_TOPOLOGY_METRO = get_applications_table("FLUX_OPS_CENTER_TOPOLOGY_METRO")
-    FLUX_OPS_CENTER_TOPOLOGY_FEEDERS = get_applications_table("FLUX_OPS_CENTER_TOPOLOGY_FEEDERS")
-    SERVICE_AREAS_MV = get_applications_table("FLUX_OPS_CENTER_SERVICE_AREAS_MV")
-    VEGETATION_RISK_COMPUTED = get_applications_table("VEGETATION_RISK_COMPUTED")
-    VEGETATION_RISK_ENHANCED = get_applications_table("VEGETATION_RISK_ENHANCED")
-    CIRCUIT_STATUS_REALTIME = get_applications_table("CIRCUIT_STATUS_REALTIME")
+    ("FLUX_OPS_CENTER_KPIS", SCHEMA_APPLICATIONS, "FLUX_OPS_CENTER_KPIS"),
+    ("FLUX_OPS_CENTER_TOPOLOGY", SCHEMA_APPLICATIONS, "FLUX_OPS_CENTER_TOPOLOGY"),
+    ("FLUX_OPS_CENTER_TOPOLOGY_METRO", SCHEMA_APPLICATIONS, "FLUX_OPS_CENTER_TOPOLOGY_METRO"),
+    ("FLUX_OPS_CENTER_TOPOLOGY_FEEDERS", SCHEMA_APPLICATIONS, "FLUX_OPS_CENTER_TOPOLOGY_FEEDERS"),
+    ("SERVICE_AREAS_MV", SCHEMA_APPLICATIONS, "FLUX_OPS_CENTER_SERVICE_AREAS_MV"),
+    ("VEGETATION_RISK_COMPUTED", SCHEMA_APPLICATIONS, "VEGETATION_RISK_COMPUTED"),
+    ("VEGETATION_RISK_ENHANCED", SCHEMA_APPLICATIONS, "VEGETATION_RISK_ENHANCED"),
+    ("CIRCUIT_STATUS_REALTIME", SCHEMA_APPLICATIONS, "CIRCUIT_STATUS_REALTIME"),
     
     # ML_DEMO tables
-    GRID_NODES = get_ml_demo_table("GRID_NODES")
-    GRID_EDGES = get_ml_demo_table("GRID_EDGES")
-    GRID_NODES_EXTENDED = get_ml_demo_table("GRID_NODES_EXTENDED")
-    GRID_EDGES_EXTENDED = get_ml_demo_table("GRID_EDGES_EXTENDED")
-    T_TRANSFORMER_TEMPORAL_TRAINING = get_ml_demo_table("T_TRANSFORMER_TEMPORAL_TRAINING")
-    V_TRANSFORMER_ML_INFERENCE = get_ml_demo_table("V_TRANSFORMER_ML_INFERENCE")
+    ("GRID_NODES", SCHEMA_ML_DEMO, "GRID_NODES"),
+    ("GRID_EDGES", SCHEMA_ML_DEMO, "GRID_EDGES"),
+    ("GRID_NODES_EXTENDED", SCHEMA_ML_DEMO, "GRID_NODES_EXTENDED"),
+    ("GRID_EDGES_EXTENDED", SCHEMA_ML_DEMO, "GRID_EDGES_EXTENDED"),
+    ("T_TRANSFORMER_TEMPORAL_TRAINING", SCHEMA_ML_DEMO, "T_TRANSFORMER_TEMPORAL_TRAINING"),
+    ("V_TRANSFORMER_ML_INFERENCE", SCHEMA_ML_DEMO, "V_TRANSFORMER_ML_INFERENCE"),
     
     # CASCADE_ANALYSIS tables
-    NODE_CENTRALITY_FEATURES = get_cascade_table("NODE_CENTRALITY_FEATURES")
-    NODE_CENTRALITY_FEATURES_V2 = get_cascade_table("NODE_CENTRALITY_FEATURES_V2")
-    NODE_CENTRALITY_FEATURES_EXTENDED = get_cascade_table("NODE_CENTRALITY_FEATURES_EXTENDED")
-    REAL_TIME_CASCADE_PREDICTIONS = get_cascade_table("REAL_TIME_CASCADE_PREDICTIONS")
-    PRECOMPUTED_CASCADES = get_cascade_table("PRECOMPUTED_CASCADES")
-    GNN_PREDICTIONS = get_cascade_table("GNN_PREDICTIONS")
+    ("NODE_CENTRALITY_FEATURES", SCHEMA_CASCADE_ANALYSIS, "NODE_CENTRALITY_FEATURES"),
+    ("NODE_CENTRALITY_FEATURES_V2", SCHEMA_CASCADE_ANALYSIS, "NODE_CENTRALITY_FEATURES_V2"),
+    ("NODE_CENTRALITY_FEATURES_EXTENDED", SCHEMA_CASCADE_ANALYSIS, "NODE_CENTRALITY_FEATURES_EXTENDED"),
+    ("REAL_TIME_CASCADE_PREDICTIONS", SCHEMA_CASCADE_ANALYSIS, "REAL_TIME_CASCADE_PREDICTIONS"),
+    ("PRECOMPUTED_CASCADES", SCHEMA_CASCADE_ANALYSIS, "PRECOMPUTED_CASCADES"),
+    ("GNN_PREDICTIONS", SCHEMA_CASCADE_ANALYSIS, "GNN_PREDICTIONS"),
     
     # RAW tables
-    HOUSTON_BUILDINGS_FOOTPRINTS = get_table_path(SCHEMA_RAW, "HOUSTON_BUILDINGS_FOOTPRINTS")
+    ("HOUSTON_BUILDINGS_FOOTPRINTS", SCHEMA_RAW, "HOUSTON_BUILDINGS_FOOTPRINTS"),
+]
+
+
+# Common table references, e.g. Tables.TRANSFORMER_METADATA
+Tables = SimpleNamespace(**{
+    name: _default_path(schema, table) for name, schema, table in _TABLE_SPECS
+})
 
 
 # =============================================================================
@@ -143,28 +163,49 @@ def configure_session(session) -> None:
     """
     Configure a Snowpark session to use the correct database/warehouse.
     
+    The current database/warehouse are read from the connection's cached
+    session state, so a session that was created with the right context
+    costs no round trips; otherwise only the mismatched USE is issued.
+    
     Args:
         session: Snowpark Session object
     """
-    session.sql(f"USE DATABASE {DB}").collect()
-    session.sql(f"USE WAREHOUSE {WAREHOUSE}").collect()
+    if not _same_identifier(session.get_current_database(), DB):
+        session.sql(f"USE DATABASE {DB}").collect()
+    if not _same_identifier(session.get_current_warehouse(), WAREHOUSE):
+        session.sql(f"USE WAREHOUSE {WAREHOUSE}").collect()
+
+
+def _same_identifier(current: Optional[str], expected: str) -> bool:
+    """Compare a (possibly quoted) session identifier with a configured name."""
+    return current is not None and current.strip('"').upper() == expected.upper()
 
 
-def get_connection_params() -> dict:
+@lru_cache(maxsize=None)
+def get_connection_params() -> Mapping[str, Optional[str]]:
     """
     Get Snowflake connection parameters from environment.
     
+    The environment is read once per process; later calls return the same
+    read-only mapping, so connection settings cannot drift mid-run.
+    
     Returns:
-        Dict suitable for snowflake.connector.connect()
+        Read-only mapping suitable for snowflake.connector.connect(**params)
+        
+    Raises:
+        ValueError: If SNOWFLAKE_ACCOUNT is not set
     """
-    return {
-        "account": os.getenv("SNOWFLAKE_ACCOUNT"),
+    account = os.getenv("SNOWFLAKE_ACCOUNT")
+    if not account:
+        raise ValueError("SNOWFLAKE_ACCOUNT must be set to build Snowflake connection parameters")
+    return MappingProxyType({
+        "account": account,
         "user": os.getenv("SNOWFLAKE_USER"),
         "password": os.getenv("SNOWFLAKE_PASSWORD"),
         "database": DB,
         "warehouse": WAREHOUSE,
         "schema": SCHEMA_PRODUCTION,
-    }
+    })
 
 
 # Print configuration when module is loaded (for debugging)
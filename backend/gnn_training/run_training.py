@@ -15,17 +15,47 @@ Key Features:
 - Integration with Snowflake ML Model Registry
 """
 
+import asyncio
+import concurrent.futures
+import json
 import os
 import threading
+import time
 import traceback
-from datetime import datetime
+from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 
 # FastAPI for status endpoint
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 
+# Size the OpenMP/MKL pools to the CPUs this container may actually run on
+# (one thread per host core oversubscribes a limited SPCS CPU share). These
+# must be set before torch/numpy are imported to take effect.
+if hasattr(os, "sched_getaffinity"):
+    CPU_THREADS = len(os.sched_getaffinity(0))
+else:
+    CPU_THREADS = os.cpu_count() or 1
+os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(CPU_THREADS))
+
+# Training stack, imported once at module load. Guarded so the service can
+# still start (and report the failure via /status) if the image is broken.
+try:
+    import numpy as np
+    import torch
+    torch.set_num_threads(int(os.environ["OMP_NUM_THREADS"]))
+    torch.set_num_interop_threads(2)
+    import torch.nn.functional as F
+    import torch_geometric
+    from sklearn.metrics import roc_auc_score, average_precision_score
+    from train_gnn_model import GNNTrainer, TrainingConfig, CascadeGCN
+    TRAINING_IMPORT_ERROR = None
+except ImportError as e:
+    TRAINING_IMPORT_ERROR = e
+    print(f"WARNING: Training dependencies not available: {e}")
+
 # ==============================================================================
 # Configuration
 # ==============================================================================
@@ -33,11 +63,21 @@ SNOWFLAKE_WAREHOUSE = os.getenv("SNOWFLAKE_WAREHOUSE", "FLUX_WH")
 SNOWFLAKE_DATABASE = os.getenv("SNOWFLAKE_DATABASE", "FLUX_DB")
 SNOWFLAKE_SCHEMA = os.getenv("SNOWFLAKE_SCHEMA", "CASCADE_ANALYSIS")
 
-# Training status tracking (thread-safe via GIL for simple dict updates)
+# Publish epoch progress to /status every N epochs rather than every epoch
+STATUS_PUBLISH_EVERY = int(os.getenv("STATUS_PUBLISH_EVERY", "5"))
+
+# Early-stopping patience lives on the device; it is read back every N epochs
+EARLY_STOP_CHECK_EVERY = 5
+
+# Eager epochs run (on a side stream) before the epoch step is captured into
+# a CUDA graph
+CUDA_GRAPH_WARMUP_EPOCHS = 3
+
+# Training status tracking (written only by the training thread)
 training_status = {
     "status": "initializing",
-    "started_at": None,
-    "completed_at": None,
+    "started_ns": None,     # time.monotonic_ns(); formatted by _serialize_status()
+    "completed_ns": None,
     "current_epoch": 0,
     "total_epochs": 200,
     "current_phase": "startup",
@@ -51,9 +91,78 @@ training_status = {
     "edges_loaded": 0,
 }
 
+# Wall-clock anchor for turning monotonic timestamps back into ISO strings
+_WALL_ANCHOR_S = time.time()
+_MONO_ANCHOR_NS = time.monotonic_ns()
+
+
+def _monotonic_to_iso(mono_ns):
+    """Format a time.monotonic_ns() reading as a UTC ISO-8601 string."""
+    if mono_ns is None:
+        return None
+    wall = _WALL_ANCHOR_S + (mono_ns - _MONO_ANCHOR_NS) / 1e9
+    return datetime.fromtimestamp(wall, timezone.utc).isoformat()
+
+
+def _serialize_status() -> bytes:
+    """
+    Encode training_status as the /status payload.
+
+    The training thread only records monotonic nanosecond stamps; they are
+    published as started_at/completed_at ISO strings here, at refresh time.
+    """
+    payload = {
+        k: v for k, v in training_status.items()
+        if k not in ("started_ns", "completed_ns")
+    }
+    payload["started_at"] = _monotonic_to_iso(training_status["started_ns"])
+    payload["completed_at"] = _monotonic_to_iso(training_status["completed_ns"])
+    return json.dumps(payload).encode()
+
+
+# Pre-serialized snapshot of training_status served by /status. The training
+# thread refreshes it whenever the status changes, so requests never re-encode.
+_status_lock = threading.Lock()
+_status_bytes: bytes = _serialize_status()
+
+
+# Set on service shutdown; the epoch loop checks it so training stops cleanly
+_shutdown_event = threading.Event()
+
+
+def _refresh_status_bytes() -> None:
+    """Re-serialize training_status after the training thread updates it."""
+    global _status_bytes
+    body = _serialize_status()
+    with _status_lock:
+        _status_bytes = body
+
+
+def status_view() -> bytes:
+    """Return the pre-serialized /status payload."""
+    with _status_lock:
+        return _status_bytes
+
+
 # ==============================================================================
 # Snowflake Session Management for SPCS
 # ==============================================================================
+SPCS_TOKEN_PATH = "/snowflake/session/token"
+
+# SPCS rotates the OAuth token file; cache its contents keyed by mtime
+_token_cache = {"mtime": None, "value": None}
+
+
+def read_spcs_token(token_path: str = SPCS_TOKEN_PATH) -> str:
+    """Return the SPCS OAuth token, re-reading the file only after it changes."""
+    mtime = os.stat(token_path).st_mtime
+    if mtime != _token_cache["mtime"]:
+        with open(token_path, "r") as f:
+            _token_cache["value"] = f.read().strip()
+        _token_cache["mtime"] = mtime
+    return _token_cache["value"]
+
+
 def create_snowflake_session():
     """
     Create Snowflake session using SPCS authentication.
@@ -64,13 +173,10 @@ def create_snowflake_session():
     from snowflake.snowpark import Session
 
     # Check if running in SPCS (token file exists)
-    token_path = "/snowflake/session/token"
-
-    if os.path.exists(token_path):
+    if os.path.exists(SPCS_TOKEN_PATH):
         # SPCS OAuth token authentication
         print("Detected SPCS environment, using OAuth token authentication")
-        with open(token_path, "r") as f:
-            token = f.read().strip()
+        token = read_spcs_token()
 
         connection_params = {
             "account": os.getenv("SNOWFLAKE_ACCOUNT"),
@@ -80,6 +186,8 @@ def create_snowflake_session():
             "warehouse": SNOWFLAKE_WAREHOUSE,
             "database": SNOWFLAKE_DATABASE,
             "schema": SNOWFLAKE_SCHEMA,
+            # Keep the OAuth-backed session alive across long training phases
+            "client_session_keep_alive": True,
         }
     else:
         # Local development - use connection name
@@ -90,18 +198,31 @@ def create_snowflake_session():
     return Session.builder.configs(connection_params).create()
 
 
+# Start the Snowflake session handshake at module import so it overlaps with
+# FastAPI/uvicorn startup; run_training() collects the session.
+# The same single worker later runs trainer.load_data(), so the data fetch is
+# queued behind the handshake and never races it.
+_background_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="training-warmup"
+)
+_warmup_future = _background_executor.submit(create_snowflake_session)
+
+
 # ==============================================================================
 # FastAPI Application
 # ==============================================================================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager - start training on startup."""
-    # Start training in background thread
-    training_thread = threading.Thread(target=run_training, daemon=True)
-    training_thread.start()
-    print("Training thread started")
-    yield
-    print("Application shutting down")
+    # Run training in a worker thread behind an observable asyncio task
+    app.state.training_task = asyncio.create_task(asyncio.to_thread(run_training))
+    print("Training task started")
+    try:
+        yield
+    finally:
+        print("Application shutting down")
+        _shutdown_event.set()
+        app.state.training_task.cancel()
 
 
 app = FastAPI(
@@ -115,17 +236,25 @@ app = FastAPI(
 @app.get("/health")
 async def health():
     """Health check endpoint for SPCS."""
-    return {
-        "status": "healthy",
+    task = app.state.training_task
+    crashed = training_status["status"] == "failed" or (
+        task.done() and not task.cancelled() and task.exception() is not None
+    )
+    body = {
+        "status": "unhealthy" if crashed else "healthy",
         "service": "gnn-cascade-trainer",
-        "timestamp": datetime.utcnow().isoformat()
+        "training_running": not task.done(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
+    if crashed:
+        return JSONResponse(status_code=503, content=body)
+    return body
 
 
 @app.get("/status")
 async def get_status():
     """Get current training status."""
-    return JSONResponse(content=training_status)
+    return Response(content=status_view(), media_type="application/json")
 
 
 @app.get("/metrics")
@@ -168,9 +297,40 @@ def run_training():
         # Phase 1: Environment Setup
         # ======================================================================
         training_status["current_phase"] = "environment_setup"
-        training_status["started_at"] = datetime.utcnow().isoformat()
+        training_status["started_ns"] = time.monotonic_ns()
+
+        if TRAINING_IMPORT_ERROR is not None:
+            raise TRAINING_IMPORT_ERROR
+
+        config = TrainingConfig(
+            hidden_dim=64,
+            num_layers=3,
+            dropout=0.3,
+            learning_rate=0.01,
+            epochs=200,
+            patience=30,
+            cascade_depth=3,
+            num_cascade_seeds=20
+        )
+
+        training_status["total_epochs"] = config.epochs
+
+        # Create the trainer and start pulling nodes/edges from Snowflake in
+        # the background; the network fetch overlaps the GPU setup below.
+        trainer = GNNTrainer(config)
+
+        def load_graph_data():
+            trainer.session = _warmup_future.result()
+            trainer.load_data()
 
-        import torch
+        data_future = _background_executor.submit(load_graph_data)
+
+        # Graph shapes are static after build_graph(), so let cuDNN autotune
+        # once, and run FP32 matmuls on TF32 tensor cores (Ampere+)
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.set_float32_matmul_precision('high')
 
         # Detect GPU
         if torch.cuda.is_available():
@@ -181,12 +341,14 @@ def run_training():
             )
             print(f"GPU Detected: {training_status['gpu_name']}")
             print(f"GPU Memory: {training_status['gpu_memory_gb']} GB")
+            # Create the CUDA context now rather than on the first upload
+            torch.zeros(1, device='cuda')
         else:
             training_status["device"] = "cpu"
             print("WARNING: No GPU detected, training will be slower")
+        _refresh_status_bytes()
 
         # Verify PyTorch Geometric
-        import torch_geometric
         print(f"PyTorch Version: {torch.__version__}")
         print(f"PyTorch Geometric Version: {torch_geometric.__version__}")
         print(f"CUDA Available: {torch.cuda.is_available()}")
@@ -196,32 +358,16 @@ def run_training():
         # ======================================================================
         training_status["status"] = "loading_data"
         training_status["current_phase"] = "data_loading"
+        _refresh_status_bytes()
         print("\n" + "="*60)
         print("LOADING DATA FROM SNOWFLAKE")
         print("="*60)
 
-        from train_gnn_model import GNNTrainer, TrainingConfig
-
-        config = TrainingConfig(
-            hidden_dim=64,
-            num_layers=3,
-            dropout=0.3,
-            learning_rate=0.01,
-            epochs=200,
-            patience=30,
-            cascade_depth=3,
-            num_cascade_seeds=20
-        )
-
-        training_status["total_epochs"] = config.epochs
-
-        # Create trainer and load data
-        trainer = GNNTrainer(config)
-        trainer.session = create_snowflake_session()
-
-        trainer.load_data()
+        # Wait for the background load; re-raises any Snowflake error here
+        data_future.result()
         training_status["nodes_loaded"] = len(trainer.nodes_df)
         training_status["edges_loaded"] = len(trainer.edges_df)
+        _refresh_status_bytes()
 
         print(f"Loaded {training_status['nodes_loaded']} nodes")
         print(f"Loaded {training_status['edges_loaded']} edges")
@@ -230,6 +376,7 @@ def run_training():
         # Phase 3: Graph Construction
         # ======================================================================
         training_status["current_phase"] = "graph_construction"
+        _refresh_status_bytes()
         print("\nBuilding graph structure...")
         trainer.build_graph()
 
@@ -237,6 +384,7 @@ def run_training():
         # Phase 4: Label Generation
         # ======================================================================
         training_status["current_phase"] = "label_generation"
+        _refresh_status_bytes()
         print("\nGenerating cascade labels...")
         trainer.generate_cascade_labels()
 
@@ -245,6 +393,7 @@ def run_training():
         # ======================================================================
         training_status["status"] = "training"
         training_status["current_phase"] = "model_training"
+        _refresh_status_bytes()
         print("\n" + "="*60)
         print("TRAINING GNN MODEL ON GPU")
         print("="*60)
@@ -253,12 +402,14 @@ def run_training():
         metrics = train_with_status_updates(trainer, training_status)
 
         training_status["metrics"] = metrics
+        _refresh_status_bytes()
 
         # ======================================================================
         # Phase 6: Save Predictions
         # ======================================================================
         training_status["status"] = "saving_predictions"
         training_status["current_phase"] = "saving_predictions"
+        _refresh_status_bytes()
         print("\nWriting predictions to Snowflake...")
         trainer.write_predictions_to_snowflake()
 
@@ -267,6 +418,7 @@ def run_training():
         # ======================================================================
         training_status["status"] = "registering_model"
         training_status["current_phase"] = "model_registration"
+        _refresh_status_bytes()
         print("\nRegistering model in Snowflake ML Registry...")
         trainer.register_model()
 
@@ -275,7 +427,8 @@ def run_training():
         # ======================================================================
         training_status["status"] = "completed"
         training_status["current_phase"] = "done"
-        training_status["completed_at"] = datetime.utcnow().isoformat()
+        training_status["completed_ns"] = time.monotonic_ns()
+        _refresh_status_bytes()
 
         print("\n" + "="*60)
         print("TRAINING COMPLETED SUCCESSFULLY")
@@ -289,7 +442,8 @@ def run_training():
         training_status["status"] = "failed"
         training_status["error"] = str(e)
         training_status["error_traceback"] = traceback.format_exc()
-        training_status["completed_at"] = datetime.utcnow().isoformat()
+        training_status["completed_ns"] = time.monotonic_ns()
+        _refresh_status_bytes()
 
         print(f"\nTRAINING FAILED: {e}")
         traceback.print_exc()
@@ -301,45 +455,38 @@ def train_with_status_updates(trainer, status_dict):
 
     This wraps the trainer's train() method to provide epoch-by-epoch updates.
     """
-    import torch
-    import torch.nn.functional as F
-    from sklearn.model_selection import train_test_split
-    from sklearn.metrics import (
-        roc_auc_score, precision_recall_fscore_support, average_precision_score
-    )
-    import numpy as np
-
-    from train_gnn_model import CascadeGCN
-
     config = trainer.config
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
-    # Move data to device
-    x = trainer.x.to(device)
-    edge_index = trainer.edge_index.to(device)
-    y = trainer.y.to(device)
-
-    # Train/val/test split
-    num_nodes = len(trainer.nodes_df)
-    indices = np.arange(num_nodes)
-
-    train_idx, temp_idx = train_test_split(
-        indices, test_size=(1 - config.train_split), random_state=42
-    )
-    val_size = config.val_split / (1 - config.train_split)
-    val_idx, test_idx = train_test_split(temp_idx, test_size=(1 - val_size), random_state=42)
+    def to_device(t):
+        """Upload from pinned host memory so the copy is an async DMA transfer."""
+        if device.type == 'cuda':
+            t = t.pin_memory()
+        return t.to(device, non_blocking=True)
 
-    train_mask = torch.zeros(num_nodes, dtype=torch.bool)
-    val_mask = torch.zeros(num_nodes, dtype=torch.bool)
-    test_mask = torch.zeros(num_nodes, dtype=torch.bool)
+    # Move data to device; the uploads are issued back to back and overlap on
+    # the copy engine until the first forward pass consumes them
+    x = to_device(trainer.x)
+    edge_index = to_device(trainer.edge_index).long()
+    y = to_device(trainer.y)
 
-    train_mask[train_idx] = True
-    val_mask[val_idx] = True
-    test_mask[test_idx] = True
+    # Fixed topology: normalize the adjacency once for every epoch
+    edge_index, edge_weight = CascadeGCN.normalize_graph(edge_index, x.size(0))
 
-    train_mask = train_mask.to(device)
-    val_mask = val_mask.to(device)
-    test_mask = test_mask.to(device)
+    # Train/val/test split: one seeded permutation, sliced into the three sets
+    num_nodes = len(trainer.nodes_df)
+    perm = np.random.default_rng(42).permutation(num_nodes)
+    n_train = int(config.train_split * num_nodes)
+    n_val = int(config.val_split * num_nodes)
+    train_idx = perm[:n_train]
+    val_idx = perm[n_train:n_train + n_val]
+    test_idx = perm[n_train + n_val:]
+
+    # Static split as sorted index tensors: index_select is a single gather
+    # with a fixed output shape (no bool->index nonzero, graph-capture safe)
+    train_index = to_device(torch.from_numpy(np.sort(train_idx)))
+    val_index = to_device(torch.from_numpy(np.sort(val_idx)))
+    test_index = to_device(torch.from_numpy(np.sort(test_idx)))
 
     print(f"Split: Train={len(train_idx)}, Val={len(val_idx)}, Test={len(test_idx)}")
 
@@ -355,69 +502,191 @@ def train_with_status_updates(trainer, status_dict):
     print(f"Model on device: {device}")
     print(f"Parameters: {sum(p.numel() for p in model.parameters()):,}")
 
-    # Optimizer
+    # Optimizer (capturable so optimizer.step() can be recorded in a CUDA graph)
+    use_cuda_graph = device.type == 'cuda'
     optimizer = torch.optim.Adam(
         model.parameters(),
         lr=config.learning_rate,
-        weight_decay=config.weight_decay
+        weight_decay=config.weight_decay,
+        capturable=use_cuda_graph
     )
 
-    # Training loop with status updates
-    best_val_loss = float('inf')
-    patience_counter = 0
-
-    for epoch in range(config.epochs):
-        # Update status
-        status_dict["current_epoch"] = epoch + 1
+    # BF16 autocast for the forward pass: message passing is bandwidth bound,
+    # and BF16 needs no GradScaler. The autocast weight cache must be off for
+    # CUDA graph capture.
+    use_amp = device.type == 'cuda' and torch.cuda.is_bf16_supported()
 
-        # Training step
-        model.train()
-        optimizer.zero_grad()
+    def forward():
+        with torch.autocast(device_type=device.type, dtype=torch.bfloat16,
+                            enabled=use_amp, cache_enabled=False):
+            return model(x, edge_index, edge_weight)
 
-        out = model(x, edge_index)
-        train_loss = F.binary_cross_entropy(out[train_mask], y[train_mask])
+    def masked_bce(out, target, index):
+        # The model returns logits; upcast them so the loss runs in FP32
+        return F.binary_cross_entropy_with_logits(
+            out.float().index_select(0, index), target.index_select(0, index)
+        )
 
+    # On GPU, inductor fuses the upcast, gather and BCE into one kernel (and
+    # the matching backward). The default mode is used because the epoch step
+    # is already captured into a CUDA graph below.
+    if use_cuda_graph:
+        masked_bce = torch.compile(masked_bce, fullgraph=True)
+
+    # On-device mirror of the best weights, refreshed in place on improvement
+    # and copied to the host once after training. state_dict() tensors alias
+    # the live parameters/buffers, so it is taken once.
+    live_state = model.state_dict()
+    best_state = {k: v.detach().clone() for k, v in live_state.items()}
+
+    # Per-epoch [train, val] losses stay on the device; they are only read
+    # back (one batched sync) when a progress line is printed
+    loss_log = torch.empty(config.epochs, 2, device=device)
+
+    # Early-stopping state is kept on the device so the loop never branches
+    # on a GPU value each epoch
+    best_val_loss = torch.tensor(float('inf'), device=device)
+    patience_counter = torch.zeros((), dtype=torch.long, device=device)
+
+    def track_best(val_loss):
+        """Select best loss/weights and patience with torch.where."""
+        improved = val_loss < best_val_loss
+        best_val_loss.copy_(torch.where(improved, val_loss, best_val_loss))
+        patience_counter.copy_(torch.where(improved, torch.zeros_like(patience_counter),
+                                           patience_counter + 1))
+        # Select rather than blend, so NaN/inf in diverged live weights can
+        # never leak into the kept snapshot on a non-improving epoch
+        for k, best in best_state.items():
+            best.copy_(torch.where(improved, live_state[k], best))
+
+    def train_step():
+        """
+        One epoch from a single forward pass.
+
+        The graph is static and transductive, so the validation loss is read
+        from the same logits as the training loss instead of a second forward.
+        It is computed (and the best weights tracked) before optimizer.step(),
+        so each val_loss is paired with the weights that produced it.
+        """
+        out = forward()
+        train_loss = masked_bce(out, y, train_index)
+        with torch.no_grad():
+            val_loss = masked_bce(out.detach(), y, val_index)
+            track_best(val_loss)
         train_loss.backward()
         optimizer.step()
+        return train_loss.detach(), val_loss
+
+    def eager_epoch():
+        optimizer.zero_grad(set_to_none=True)
+        return train_step()
+
+    def capture_graphs():
+        """
+        Record one full training epoch as a CUDA graph.
+
+        The capture draws every intermediate from an explicit private memory
+        pool. The warmup epochs have already grown the caching allocator to
+        its steady state, and replays reuse the pool's fixed addresses, so
+        no allocator calls happen once the graph is live.
+        """
+        pool = torch.cuda.graph_pool_handle()
+        train_graph = torch.cuda.CUDAGraph()
+        optimizer.zero_grad(set_to_none=True)
+        with torch.cuda.graph(train_graph, pool=pool):
+            static_train_loss, static_val_loss = train_step()
+        return train_graph, static_train_loss, static_val_loss
+
+    side_stream = torch.cuda.Stream() if use_cuda_graph else None
+    graphs = None
+
+    # Training loop with status updates (dropout stays active throughout)
+    model.train()
+    for epoch in range(config.epochs):
+        if _shutdown_event.is_set():
+            raise RuntimeError("Training cancelled by service shutdown")
 
-        # Validation step
-        model.eval()
-        with torch.no_grad():
-            out = model(x, edge_index)
-            val_loss = F.binary_cross_entropy(out[val_mask], y[val_mask])
-
-        # Early stopping
-        if val_loss < best_val_loss:
-            best_val_loss = val_loss
-            patience_counter = 0
-            trainer.best_model_state = {k: v.cpu().clone() for k, v in model.state_dict().items()}
+        # Update status; the served snapshot is only rebuilt every few epochs
+        status_dict["current_epoch"] = epoch + 1
+        if (epoch + 1) % STATUS_PUBLISH_EVERY == 0:
+            _refresh_status_bytes()
+
+        if graphs is not None:
+            # Replay the captured epoch
+            train_graph, train_loss, val_loss = graphs
+            train_graph.replay()
+        elif side_stream is not None:
+            # Warmup epochs run on a side stream, as graph capture requires
+            side_stream.wait_stream(torch.cuda.current_stream())
+            with torch.cuda.stream(side_stream):
+                train_loss, val_loss = eager_epoch()
+            torch.cuda.current_stream().wait_stream(side_stream)
+
+            if epoch + 1 == CUDA_GRAPH_WARMUP_EPOCHS:
+                try:
+                    graphs = capture_graphs()
+                    print(f"Captured training step as CUDA graph after {epoch+1} warmup epochs")
+                except RuntimeError as e:
+                    print(f"WARNING: CUDA graph capture failed, continuing eagerly: {e}")
+                    side_stream = None
         else:
-            patience_counter += 1
+            train_loss, val_loss = eager_epoch()
 
-        if patience_counter >= config.patience:
+        loss_log[epoch, 0] = train_loss
+        loss_log[epoch, 1] = val_loss
+
+        if (epoch + 1) % EARLY_STOP_CHECK_EVERY == 0 and patience_counter.item() >= config.patience:
             print(f"Early stopping at epoch {epoch+1}")
             break
 
         if (epoch + 1) % 20 == 0:
-            print(f"Epoch {epoch+1:3d}: Train Loss={train_loss:.4f}, Val Loss={val_loss:.4f}")
+            epoch_train_loss, epoch_val_loss = loss_log[epoch].tolist()
+            print(f"Epoch {epoch+1:3d}: Train Loss={epoch_train_loss:.4f}, Val Loss={epoch_val_loss:.4f}")
+
+    # Publish the final epoch count (early stop / non-multiple of N)
+    _refresh_status_bytes()
 
-    # Load best model and evaluate
-    model.load_state_dict(trainer.best_model_state)
+    # Load best model and evaluate; keep a host copy for saving/registration
+    model.load_state_dict(best_state)
+    trainer.best_model_state = {k: v.cpu() for k, v in best_state.items()}
     model.eval()
 
     with torch.no_grad():
-        predictions = model(x, edge_index)
-
-    # Calculate metrics
-    y_test = y[test_mask].cpu().numpy()
-    y_pred = predictions[test_mask].cpu().numpy()
-    y_pred_binary = (y_pred > 0.5).astype(int)
-
-    auc = roc_auc_score(y_test, y_pred) if len(np.unique(y_test)) > 1 else 0.0
-    ap = average_precision_score(y_test, y_pred) if len(np.unique(y_test)) > 1 else 0.0
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        y_test, y_pred_binary, average='binary', zero_division=0
-    )
+        predictions = model.predict_proba(x, edge_index, edge_weight)
+
+    # Calculate metrics: confusion counts in one device reduction, read back
+    # together; sklearn only for the ranking metrics (AUC / AP)
+    y_test_t = y.index_select(0, test_index)
+    y_pred_t = predictions.index_select(0, test_index)
+
+    # Test predictions/labels come back through pinned host buffers as two
+    # async DMA copies; the confusion-count readback below runs on the same
+    # stream, so it returns only once both copies have landed
+    if device.type == 'cuda':
+        host_y = torch.empty(y_test_t.shape, dtype=y_test_t.dtype, pin_memory=True)
+        host_pred = torch.empty(y_pred_t.shape, dtype=y_pred_t.dtype, pin_memory=True)
+        host_y.copy_(y_test_t, non_blocking=True)
+        host_pred.copy_(y_pred_t, non_blocking=True)
+    else:
+        host_y, host_pred = y_test_t, y_pred_t
+
+    pred_pos = y_pred_t > 0.5
+    true_pos = y_test_t > 0.5
+    tp, fp, fn = torch.stack([
+        (pred_pos & true_pos).sum(),
+        (pred_pos & ~true_pos).sum(),
+        (~pred_pos & true_pos).sum(),
+    ]).tolist()
+
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0
+
+    y_test = host_y.numpy()
+    y_pred = host_pred.numpy()
+    has_both_classes = 0 < tp + fn < len(y_test)
+    auc = roc_auc_score(y_test, y_pred) if has_both_classes else 0.0
+    ap = average_precision_score(y_test, y_pred) if has_both_classes else 0.0
 
     metrics = {
         'auc_roc': float(auc),
@@ -445,7 +714,7 @@ def main():
     print("="*70)
     print("PRODUCTION: GNN CASCADE TRAINING SERVICE")
     print("="*70)
-    print(f"Started at: {datetime.utcnow().isoformat()}")
+    print(f"Started at: {datetime.now(timezone.utc).isoformat()}")
     print(f"Warehouse: {SNOWFLAKE_WAREHOUSE}")
     print(f"Database: {SNOWFLAKE_DATABASE}")
     print(f"Schema: {SNOWFLAKE_SCHEMA}")
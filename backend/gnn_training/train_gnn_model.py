@@ -26,12 +26,11 @@ This resolves the compromise of having a notebook that was never executed.
 import os
 import sys
 import time
-import pickle
+import json
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
-from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
 # Check for PyTorch
 try:
@@ -46,12 +45,21 @@ except ImportError:
 # Check for PyTorch Geometric
 try:
     from torch_geometric.nn import GCNConv
+    from torch_geometric.nn.conv.gcn_conv import gcn_norm
     from torch_geometric.data import Data
     PYG_AVAILABLE = True
 except ImportError:
     PYG_AVAILABLE = False
     print("WARNING: PyTorch Geometric not available. Install with: pip install torch-geometric")
 
+# Check for safetensors (model weights artifact)
+try:
+    from safetensors.torch import save_file, load_file
+    SAFETENSORS_AVAILABLE = True
+except ImportError:
+    SAFETENSORS_AVAILABLE = False
+
+from scipy.sparse import csr_matrix
 from snowflake.snowpark import Session
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import roc_auc_score, precision_recall_fscore_support, average_precision_score
@@ -64,6 +72,10 @@ SCHEMA_CASCADE = "CASCADE_ANALYSIS"
 MODEL_NAME = "CASCADE_GCN_MODEL"
 MODEL_VERSION = "v2_production"
 
+# Eager epochs run (on a side stream) before the epoch step is captured into
+# a CUDA graph
+CUDA_GRAPH_WARMUP_EPOCHS = 3
+
 
 @dataclass
 class TrainingConfig:
@@ -80,6 +92,8 @@ class TrainingConfig:
     # Cascade simulation parameters
     cascade_depth: int = 3
     num_cascade_seeds: int = 20
+    # Run the cascade BFS in Snowflake (recursive CTE) instead of locally
+    labels_in_warehouse: bool = False
 
 
 class CascadeGCN(nn.Module):
@@ -91,15 +105,19 @@ class CascadeGCN(nn.Module):
     - Layer 1: 10 → 64 with ReLU + Dropout
     - Layer 2: 64 → 64 with ReLU + Dropout
     - Layer 3: 64 → 32 with ReLU
-    - Output: 32 → 1 with Sigmoid
+    - Output: 32 → 1 logit (predict_proba applies the sigmoid)
     """
 
     def __init__(self, num_features: int = 10, hidden_dim: int = 64, dropout: float = 0.3):
         super().__init__()
 
-        self.conv1 = GCNConv(num_features, hidden_dim)
-        self.conv2 = GCNConv(hidden_dim, hidden_dim)
-        self.conv3 = GCNConv(hidden_dim, hidden_dim // 2)
+        # The layers take a pre-normalized adjacency (see normalize_graph), so
+        # D^-1/2 (A + I) D^-1/2 is computed once for all three layers. This
+        # also keeps the forward free of host syncs, which CUDA graph capture
+        # requires.
+        self.conv1 = GCNConv(num_features, hidden_dim, normalize=False)
+        self.conv2 = GCNConv(hidden_dim, hidden_dim, normalize=False)
+        self.conv3 = GCNConv(hidden_dim, hidden_dim // 2, normalize=False)
 
         self.bn1 = nn.BatchNorm1d(hidden_dim)
         self.bn2 = nn.BatchNorm1d(hidden_dim)
@@ -108,44 +126,85 @@ class CascadeGCN(nn.Module):
         self.dropout = nn.Dropout(dropout)
         self.fc = nn.Linear(hidden_dim // 2, 1)
 
-    def forward(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+    @staticmethod
+    def normalize_graph(edge_index: torch.Tensor,
+                        num_nodes: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Add self-loops and compute symmetric GCN edge weights, once per graph."""
+        return gcn_norm(edge_index, None, num_nodes, add_self_loops=True)
+
+    def forward(self, x: torch.Tensor, edge_index: torch.Tensor,
+                edge_weight: Optional[torch.Tensor] = None) -> torch.Tensor:
+        if edge_weight is None:
+            edge_index, edge_weight = self.normalize_graph(edge_index, x.size(0))
+
+        # ReLU runs in place on the BatchNorm output (BatchNorm's backward only
+        # needs its input). Dropout stays out of place: ReLU's backward reads
+        # its own output, which an in-place dropout would overwrite.
+
         # Layer 1
-        x = self.conv1(x, edge_index)
+        x = self.conv1(x, edge_index, edge_weight)
         x = self.bn1(x)
-        x = F.relu(x)
+        x = F.relu_(x)
         x = self.dropout(x)
 
         # Layer 2
-        x = self.conv2(x, edge_index)
+        x = self.conv2(x, edge_index, edge_weight)
         x = self.bn2(x)
-        x = F.relu(x)
+        x = F.relu_(x)
         x = self.dropout(x)
 
         # Layer 3
-        x = self.conv3(x, edge_index)
+        x = self.conv3(x, edge_index, edge_weight)
         x = self.bn3(x)
-        x = F.relu(x)
+        x = F.relu_(x)
 
-        # Output
-        return torch.sigmoid(self.fc(x)).squeeze(-1)
+        # Output logits; the sigmoid is fused into the loss during training
+        return self.fc(x).squeeze(-1)
 
-    def get_embeddings(self, x: torch.Tensor, edge_index: torch.Tensor) -> torch.Tensor:
+    def predict_proba(self, x: torch.Tensor, edge_index: torch.Tensor,
+                      edge_weight: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """Cascade probability per node."""
+        return torch.sigmoid(self(x, edge_index, edge_weight))
+
+    def get_embeddings(self, x: torch.Tensor, edge_index: torch.Tensor,
+                       edge_weight: Optional[torch.Tensor] = None) -> torch.Tensor:
         """Get node embeddings from final hidden layer."""
-        x = self.conv1(x, edge_index)
+        if edge_weight is None:
+            edge_index, edge_weight = self.normalize_graph(edge_index, x.size(0))
+
+        x = self.conv1(x, edge_index, edge_weight)
         x = self.bn1(x)
-        x = F.relu(x)
+        x = F.relu_(x)
 
-        x = self.conv2(x, edge_index)
+        x = self.conv2(x, edge_index, edge_weight)
         x = self.bn2(x)
-        x = F.relu(x)
+        x = F.relu_(x)
 
-        x = self.conv3(x, edge_index)
+        x = self.conv3(x, edge_index, edge_weight)
         x = self.bn3(x)
-        x = F.relu(x)
+        x = F.relu_(x)
 
         return x
 
 
+class CascadeGCNProbability(nn.Module):
+    """
+    Registry-facing view of a CascadeGCN whose forward returns probabilities.
+
+    CascadeGCN.forward returns logits for the fused training loss; models
+    served from the Model Registry keep the original contract of one cascade
+    probability in [0, 1] per node.
+    """
+
+    def __init__(self, model: CascadeGCN):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x: torch.Tensor, edge_index: torch.Tensor,
+                edge_weight: Optional[torch.Tensor] = None) -> torch.Tensor:
+        return self.model.predict_proba(x, edge_index, edge_weight)
+
+
 class GNNTrainer:
     """Handles data loading, training, and model registration."""
 
@@ -157,12 +216,14 @@ class GNNTrainer:
         # Data
         self.nodes_df: Optional[pd.DataFrame] = None
         self.edges_df: Optional[pd.DataFrame] = None
-        self.node_id_to_idx: Dict[str, int] = {}
-        self.idx_to_node_id: Dict[int, str] = {}
+        # Node index i is the position of its NODE_ID in node_ids; the
+        # index's hash table maps whole ID columns to positions in C code
+        self.node_ids: Optional[pd.Index] = None
 
         # Graph data
         self.x: Optional[torch.Tensor] = None  # Node features
         self.edge_index: Optional[torch.Tensor] = None  # Edge connectivity
+        self.adjacency: Optional[csr_matrix] = None  # Same edges as CSR, for BFS
         self.y: Optional[torch.Tensor] = None  # Labels
 
         # Model
@@ -170,6 +231,13 @@ class GNNTrainer:
         self.best_model_state: Optional[dict] = None
         self.metrics: Dict = {}
 
+    def _host_tensor(self, array: np.ndarray) -> torch.Tensor:
+        """Wrap a graph array as a tensor, page-locked when training on GPU."""
+        tensor = torch.from_numpy(array)
+        if self.device.type == 'cuda':
+            tensor = tensor.pin_memory()
+        return tensor
+
     def create_session(self) -> Session:
         """Create Snowflake session."""
         if self.session is None:
@@ -184,9 +252,10 @@ class GNNTrainer:
 
         session = self.create_session()
 
-        # Load nodes with centrality features
-        print("\nLoading nodes with centrality features...")
-        self.nodes_df = session.sql(f"""
+        # Submit both queries without blocking so the edges query runs while
+        # the nodes result is fetched and converted to pandas
+        print("\nLoading nodes with centrality features and edges...")
+        nodes_job = session.sql(f"""
             SELECT
                 n.NODE_ID,
                 n.NODE_TYPE,
@@ -206,22 +275,29 @@ class GNNTrainer:
             LEFT JOIN {DB}.{SCHEMA_CASCADE}.NODE_CENTRALITY_FEATURES c
                 ON n.NODE_ID = c.NODE_ID
             WHERE n.LAT IS NOT NULL AND n.LON IS NOT NULL
-        """).to_pandas()
-        print(f"  Loaded {len(self.nodes_df)} nodes")
-
-        # Load edges
-        print("Loading edges...")
-        self.edges_df = session.sql(f"""
+        """).to_pandas(block=False)
+        edges_job = session.sql(f"""
             SELECT FROM_NODE_ID, TO_NODE_ID, DISTANCE_KM, EDGE_TYPE
             FROM {DB}.{SCHEMA_ML_DEMO}.GRID_EDGES
-        """).to_pandas()
+        """).to_pandas(block=False)
+
+        self.nodes_df = nodes_job.result("pandas")
+        print(f"  Loaded {len(self.nodes_df)} nodes")
+        self.edges_df = edges_job.result("pandas")
         print(f"  Loaded {len(self.edges_df)} edges")
 
+        # The LEFT JOIN can fan out when NODE_CENTRALITY_FEATURES holds more
+        # than one row per node; keep one row per NODE_ID so the index below
+        # is unique (get_indexer rejects duplicates)
+        duplicated = self.nodes_df['NODE_ID'].duplicated()
+        if duplicated.any():
+            print(f"  Warning: dropping {int(duplicated.sum())} duplicate NODE_ID rows")
+            self.nodes_df = self.nodes_df[~duplicated].reset_index(drop=True)
+
         # Create node ID mappings
-        self.node_id_to_idx = {nid: idx for idx, nid in enumerate(self.nodes_df['NODE_ID'])}
-        self.idx_to_node_id = {idx: nid for nid, idx in self.node_id_to_idx.items()}
+        self.node_ids = pd.Index(self.nodes_df['NODE_ID'])
 
-        print(f"  Created mappings for {len(self.node_id_to_idx)} nodes")
+        print(f"  Created mappings for {len(self.node_ids)} nodes")
 
     def build_graph(self) -> None:
         """Build PyTorch Geometric graph structure."""
@@ -231,21 +307,44 @@ class GNNTrainer:
 
         # Build edge index (COO format)
         print("\nBuilding edge index...")
-        source_nodes = []
-        target_nodes = []
-
-        for _, row in self.edges_df.iterrows():
-            from_idx = self.node_id_to_idx.get(row['FROM_NODE_ID'])
-            to_idx = self.node_id_to_idx.get(row['TO_NODE_ID'])
-
-            if from_idx is not None and to_idx is not None:
-                # Add bidirectional edges
-                source_nodes.extend([from_idx, to_idx])
-                target_nodes.extend([to_idx, from_idx])
-
-        self.edge_index = torch.tensor([source_nodes, target_nodes], dtype=torch.long)
+        from_idx = self.node_ids.get_indexer(self.edges_df['FROM_NODE_ID'])
+        to_idx = self.node_ids.get_indexer(self.edges_df['TO_NODE_ID'])
+        # Unknown node IDs come back as -1; drop those edges
+        known = (from_idx >= 0) & (to_idx >= 0)
+        from_idx = from_idx[known]
+        to_idx = to_idx[known]
+
+        # Bidirectional edges written straight into one [2, 2E] array. Node
+        # indices fit in int32, which halves the host buffer and the upload;
+        # the training code widens it to int64 on the device, where PyG's
+        # scatter kernels need it.
+        num_edges = len(from_idx)
+        index_dtype = np.int32 if len(self.node_ids) < np.iinfo(np.int32).max else np.int64
+        edges_np = np.empty((2, 2 * num_edges), dtype=index_dtype)
+        edges_np[0, :num_edges] = from_idx
+        edges_np[1, :num_edges] = to_idx
+        edges_np[0, num_edges:] = to_idx
+        edges_np[1, num_edges:] = from_idx
+
+        # Sorted by source so message passing reads edge_index in coalesced
+        # order. The tensor is pinned on GPU hosts so the upload in train()
+        # is an async DMA transfer.
+        order = np.lexsort((edges_np[1], edges_np[0]))
+        edges_np[0] = edges_np[0, order]
+        edges_np[1] = edges_np[1, order]
+        self.edge_index = self._host_tensor(edges_np)
         print(f"  Edge index shape: {self.edge_index.shape}")
 
+        # The sorted COO arrays already are CSR order: row pointers from the
+        # per-source counts, column indices are the targets. No re-sort.
+        num_nodes = len(self.node_ids)
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edges_np[0], minlength=num_nodes), out=indptr[1:])
+        self.adjacency = csr_matrix(
+            (np.ones(edges_np.shape[1], dtype=np.int32), edges_np[1], indptr),
+            shape=(num_nodes, num_nodes)
+        )
+
         # Build node features (10 features)
         print("Building node features...")
         feature_cols = [
@@ -255,14 +354,18 @@ class GNNTrainer:
             'CLUSTERING_COEFFICIENT', 'CASCADE_RISK_SCORE'
         ]
 
-        features = self.nodes_df[feature_cols].fillna(0).values.astype(np.float32)
+        features = np.ascontiguousarray(
+            self.nodes_df[feature_cols].fillna(0).to_numpy(dtype=np.float32, copy=True)
+        )
 
-        # Normalize features
+        # Normalize features in place (no extra N x F temporaries)
         mean = features.mean(axis=0)
-        std = features.std(axis=0) + 1e-8
-        features_normalized = (features - mean) / std
+        std = features.std(axis=0)
+        std += 1e-8
+        features -= mean
+        features /= std
 
-        self.x = torch.tensor(features_normalized, dtype=torch.float32)
+        self.x = self._host_tensor(features)
         self.feature_mean = mean
         self.feature_std = std
 
@@ -275,43 +378,40 @@ class GNNTrainer:
         print("GENERATING CASCADE LABELS")
         print("="*60)
 
-        # Build adjacency list for BFS
-        adjacency = {}
-        for i in range(self.edge_index.shape[1]):
-            src = self.edge_index[0, i].item()
-            dst = self.edge_index[1, i].item()
-            if src not in adjacency:
-                adjacency[src] = []
-            adjacency[src].append(dst)
-
-        # Get high-criticality nodes as cascade seeds
-        high_crit_idx = self.nodes_df['CASCADE_RISK_SCORE'].nlargest(
-            self.config.num_cascade_seeds
-        ).index.tolist()
-        print(f"\nUsing top {len(high_crit_idx)} nodes as cascade seeds")
-
-        # Aggregate cascade labels
-        cascade_labels = np.zeros(len(self.nodes_df))
-
-        for seed_idx in high_crit_idx:
-            # BFS cascade simulation
-            visited = {seed_idx}
-            queue = deque([(seed_idx, 0)])
-
-            while queue:
-                current, depth = queue.popleft()
-
-                if depth >= self.config.cascade_depth:
-                    continue
-
-                cascade_labels[current] = 1  # Mark as affected
-
-                for neighbor in adjacency.get(current, []):
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        queue.append((neighbor, depth + 1))
-
-        self.y = torch.tensor(cascade_labels, dtype=torch.float32)
+        if self.config.labels_in_warehouse:
+            visited = self._cascade_mask_from_warehouse()
+        else:
+            # Reuse the CSR adjacency from build_graph. Every edge is stored in
+            # both directions, so the matrix is symmetric and one SpMV with a
+            # frontier vector yields the frontier's neighbours.
+            num_nodes = len(self.nodes_df)
+            adjacency = self.adjacency
+
+            # Get high-criticality nodes as cascade seeds: positional top-k by
+            # partial sort (missing scores never seed)
+            risk = self.nodes_df['CASCADE_RISK_SCORE'].to_numpy(dtype=np.float64, na_value=np.nan)
+            risk = np.where(np.isnan(risk), -np.inf, risk)
+            k = min(self.config.num_cascade_seeds, num_nodes)
+            high_crit_idx = np.argpartition(-risk, k - 1)[:k] if k > 0 else np.arange(0)
+            high_crit_idx = high_crit_idx[np.isfinite(risk[high_crit_idx])]
+            print(f"\nUsing top {len(high_crit_idx)} nodes as cascade seeds")
+
+            # Multi-source BFS, one level per SpMV. A node is affected when it
+            # lies within cascade_depth - 1 hops of any seed, the same set the
+            # per-seed BFS produced.
+            visited = np.zeros(num_nodes, dtype=bool)
+            if self.config.cascade_depth > 0:
+                visited[high_crit_idx] = True
+            frontier = visited.copy()
+
+            for _ in range(self.config.cascade_depth - 1):
+                frontier = (adjacency @ frontier.astype(np.int32)) > 0
+                frontier &= ~visited
+                if not frontier.any():
+                    break
+                visited |= frontier
+
+        self.y = self._host_tensor(visited.astype(np.float32))
 
         positive_count = int(self.y.sum().item())
         total = len(self.y)
@@ -320,16 +420,78 @@ class GNNTrainer:
             f"({100*positive_count/total:.1f}%)"
         )
 
+    def _cascade_mask_from_warehouse(self) -> np.ndarray:
+        """
+        Compute the cascade-affected node mask server-side.
+
+        Same definition as the local BFS: seeds are the top-k nodes by
+        CASCADE_RISK_SCORE (missing scores never seed), edges are followed in
+        both directions between located nodes only, and a node is affected
+        within cascade_depth - 1 hops. Only the affected NODE_IDs are returned.
+
+        The recursive UNION ALL enumerates walks, not nodes: a node reachable
+        along several paths is emitted once per walk and only collapsed by the
+        final DISTINCT, so the intermediate row count grows with the branching
+        factor raised to cascade_depth. Keep cascade_depth small on dense grids.
+        """
+        if self.config.cascade_depth <= 0:
+            return np.zeros(len(self.node_ids), dtype=bool)
+
+        print(f"\nRunning cascade BFS in Snowflake from top {self.config.num_cascade_seeds} nodes")
+        session = self.create_session()
+        affected = session.sql(f"""
+            WITH RECURSIVE located AS (
+                SELECT
+                    n.NODE_ID,
+                    COALESCE(c.CASCADE_RISK_SCORE, n.CRITICALITY_SCORE) AS RISK
+                FROM {DB}.{SCHEMA_ML_DEMO}.GRID_NODES n
+                LEFT JOIN {DB}.{SCHEMA_CASCADE}.NODE_CENTRALITY_FEATURES c
+                    ON n.NODE_ID = c.NODE_ID
+                WHERE n.LAT IS NOT NULL AND n.LON IS NOT NULL
+            ),
+            links AS (
+                SELECT DISTINCT l.SRC, l.DST
+                FROM (
+                    SELECT FROM_NODE_ID AS SRC, TO_NODE_ID AS DST FROM {DB}.{SCHEMA_ML_DEMO}.GRID_EDGES
+                    UNION ALL
+                    SELECT TO_NODE_ID, FROM_NODE_ID FROM {DB}.{SCHEMA_ML_DEMO}.GRID_EDGES
+                ) l
+                JOIN located a ON a.NODE_ID = l.SRC
+                JOIN located b ON b.NODE_ID = l.DST
+            ),
+            cascade (NODE_ID, DEPTH) AS (
+                SELECT NODE_ID, 0
+                FROM (
+                    SELECT NODE_ID FROM located
+                    WHERE RISK IS NOT NULL
+                    ORDER BY RISK DESC
+                    LIMIT {int(self.config.num_cascade_seeds)}
+                )
+                UNION ALL
+                SELECT k.DST, c.DEPTH + 1
+                FROM cascade c
+                JOIN links k ON k.SRC = c.NODE_ID
+                WHERE c.DEPTH + 1 < {int(self.config.cascade_depth)}
+            )
+            SELECT DISTINCT NODE_ID FROM cascade
+        """).to_pandas()
+
+        return self.node_ids.isin(affected['NODE_ID'])
+
     def train(self) -> Dict:
         """Train the GNN model."""
         print("\n" + "="*60)
         print("TRAINING GNN MODEL")
         print("="*60)
 
-        # Move data to device
-        x = self.x.to(self.device)
-        edge_index = self.edge_index.to(self.device)
-        y = self.y.to(self.device)
+        # Move data to device; from pinned memory the three uploads are queued
+        # back to back and overlap with the setup below
+        x = self.x.to(self.device, non_blocking=True)
+        edge_index = self.edge_index.to(self.device, non_blocking=True).long()
+        y = self.y.to(self.device, non_blocking=True)
+
+        # Fixed topology: normalize the adjacency once for every epoch
+        edge_index, edge_weight = CascadeGCN.normalize_graph(edge_index, x.size(0))
 
         # Train/val/test split
         num_nodes = len(self.nodes_df)
@@ -341,17 +503,18 @@ class GNNTrainer:
         val_size = self.config.val_split / (1 - self.config.train_split)
         val_idx, test_idx = train_test_split(temp_idx, test_size=(1 - val_size), random_state=42)
 
-        train_mask = torch.zeros(num_nodes, dtype=torch.bool)
-        val_mask = torch.zeros(num_nodes, dtype=torch.bool)
-        test_mask = torch.zeros(num_nodes, dtype=torch.bool)
-
-        train_mask[train_idx] = True
-        val_mask[val_idx] = True
-        test_mask[test_idx] = True
-
-        train_mask = train_mask.to(self.device)
-        val_mask = val_mask.to(self.device)
-        test_mask = test_mask.to(self.device)
+        # The three splits are disjoint, so they travel as one int8 label per
+        # node (0 = train, 1 = val, 2 = test): a single N-byte upload. They are
+        # expanded on the device, once, into sorted index tensors, because
+        # index_select has a fixed output shape (unlike boolean masking) and
+        # so can be captured in a CUDA graph.
+        split = np.zeros(num_nodes, dtype=np.int8)
+        split[val_idx] = 1
+        split[test_idx] = 2
+        split_t = torch.from_numpy(split).to(self.device)
+        train_index = (split_t == 0).nonzero().squeeze(1)
+        val_index = (split_t == 1).nonzero().squeeze(1)
+        test_index = (split_t == 2).nonzero().squeeze(1)
 
         print(f"\nSplit: Train={len(train_idx)}, Val={len(val_idx)}, Test={len(test_idx)}")
 
@@ -365,52 +528,132 @@ class GNNTrainer:
         print(f"Model on device: {self.device}")
         print(f"Parameters: {sum(p.numel() for p in self.model.parameters()):,}")
 
-        # Optimizer and loss
+        # Optimizer and loss (capturable so optimizer.step() can be recorded
+        # in a CUDA graph)
+        use_cuda_graph = self.device.type == 'cuda'
         optimizer = torch.optim.Adam(
             self.model.parameters(),
             lr=self.config.learning_rate,
-            weight_decay=self.config.weight_decay
+            weight_decay=self.config.weight_decay,
+            capturable=use_cuda_graph
         )
 
         # Class imbalance handling
         pos_weight = (1 - y.mean()) / max(y.mean(), 0.01)
         print(f"Positive class weight: {pos_weight:.2f}")
 
+        # On-device mirror of the best weights, refreshed in place on
+        # improvement and copied to the host once after training.
+        # state_dict() tensors alias the live parameters/buffers.
+        live_state = self.model.state_dict()
+        best_state = {k: v.detach().clone() for k, v in live_state.items()}
+        # Weights as they were for the current epoch's forward (see train_step)
+        pre_step_state = {k: v.detach().clone() for k, v in live_state.items()}
+
         # Training loop
         best_val_loss = float('inf')
         patience_counter = 0
         train_losses = []
         val_losses = []
 
-        print(f"\nTraining for up to {self.config.epochs} epochs...")
+        # BF16 autocast for the forward pass. Unlike FP16 it needs no
+        # GradScaler, whose inf check syncs with the host and would break the
+        # CUDA graph capture below; the autocast weight cache must be off for
+        # the same reason.
+        use_amp = use_cuda_graph and torch.cuda.is_bf16_supported()
+
+        # On GPU the training forward goes through inductor, which fuses the
+        # BatchNorm/ReLU/dropout elementwise work between the GCN layers. The
+        # default mode is used because the epoch is already captured into a
+        # CUDA graph below ("reduce-overhead" would nest a second capture).
+        # The compiled wrapper shares parameters with self.model, so saved
+        # state_dicts keep their plain keys.
+        train_model = torch.compile(self.model) if use_cuda_graph else self.model
+
+        def forward():
+            with torch.autocast(device_type=self.device.type, dtype=torch.bfloat16,
+                                enabled=use_amp, cache_enabled=False):
+                out = train_model(x, edge_index, edge_weight)
+            # Upcast the logits so the loss is computed in FP32
+            return out.float()
+
+        def train_step():
+            """
+            One epoch from a single full-batch forward.
+
+            The graph is transductive, so the validation loss is read from the
+            same logits as the training loss instead of a second forward. The
+            weights that produced it are kept in pre_step_state before
+            optimizer.step(), so early stopping snapshots the matching weights.
+            """
+            out = forward()
+            train_loss = F.binary_cross_entropy_with_logits(
+                out.index_select(0, train_index), y.index_select(0, train_index),
+                pos_weight=pos_weight
+            )
+            with torch.no_grad():
+                val_loss = F.binary_cross_entropy_with_logits(
+                    out.detach().index_select(0, val_index), y.index_select(0, val_index)
+                )
+                for k, v in live_state.items():
+                    pre_step_state[k].copy_(v)
+            train_loss.backward()
+            optimizer.step()
+            return train_loss.detach(), val_loss
 
-        for epoch in range(self.config.epochs):
-            # Training
-            self.model.train()
-            optimizer.zero_grad()
+        def eager_epoch():
+            optimizer.zero_grad(set_to_none=True)
+            return train_step()
 
-            out = self.model(x, edge_index)
-            train_loss = F.binary_cross_entropy(out[train_mask], y[train_mask])
+        def capture_graphs():
+            """Record one full training epoch as a CUDA graph."""
+            train_graph = torch.cuda.CUDAGraph()
+            optimizer.zero_grad(set_to_none=True)
+            with torch.cuda.graph(train_graph):
+                static_train_loss, static_val_loss = train_step()
+            return train_graph, static_train_loss, static_val_loss
 
-            train_loss.backward()
-            optimizer.step()
+        # The topology and inputs never change, so after a few eager warmup
+        # epochs each epoch is a replay of one captured graph
+        side_stream = torch.cuda.Stream() if use_cuda_graph else None
+        graphs = None
 
-            # Validation
-            self.model.eval()
-            with torch.no_grad():
-                out = self.model(x, edge_index)
-                val_loss = F.binary_cross_entropy(out[val_mask], y[val_mask])
+        print(f"\nTraining for up to {self.config.epochs} epochs...")
 
+        # Dropout stays active for the shared forward throughout training
+        self.model.train()
+        for epoch in range(self.config.epochs):
+            if graphs is not None:
+                train_graph, train_loss, val_loss = graphs
+                train_graph.replay()
+            elif side_stream is not None:
+                # Warmup epochs run on a side stream, as graph capture requires
+                side_stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(side_stream):
+                    train_loss, val_loss = eager_epoch()
+                torch.cuda.current_stream().wait_stream(side_stream)
+
+                if epoch + 1 == CUDA_GRAPH_WARMUP_EPOCHS:
+                    try:
+                        graphs = capture_graphs()
+                        print(f"  Captured training step as CUDA graph after {epoch+1} warmup epochs")
+                    except RuntimeError as e:
+                        print(f"  WARNING: CUDA graph capture failed, continuing eagerly: {e}")
+                        side_stream = None
+            else:
+                train_loss, val_loss = eager_epoch()
+
+            # Read the losses as floats: under replay they are static graph
+            # outputs that the next epoch overwrites
             train_losses.append(train_loss.item())
             val_losses.append(val_loss.item())
 
             # Early stopping
-            if val_loss < best_val_loss:
-                best_val_loss = val_loss
+            if val_losses[-1] < best_val_loss:
+                best_val_loss = val_losses[-1]
                 patience_counter = 0
-                self.best_model_state = {
-                    k: v.cpu().clone() for k, v in self.model.state_dict().items()
-                }
+                for k, v in pre_step_state.items():
+                    best_state[k].copy_(v)
             else:
                 patience_counter += 1
 
@@ -419,18 +662,19 @@ class GNNTrainer:
                 break
 
             if (epoch + 1) % 20 == 0:
-                print(f"  Epoch {epoch+1:3d}: Train Loss={train_loss:.4f}, Val Loss={val_loss:.4f}")
+                print(f"  Epoch {epoch+1:3d}: Train Loss={train_losses[-1]:.4f}, Val Loss={val_losses[-1]:.4f}")
 
-        # Load best model and evaluate
-        self.model.load_state_dict(self.best_model_state)
+        # Load best model and evaluate; keep a host copy for saving/registration
+        self.model.load_state_dict(best_state)
+        self.best_model_state = {k: v.cpu() for k, v in best_state.items()}
         self.model.eval()
 
         with torch.no_grad():
-            predictions = self.model(x, edge_index)
+            predictions = self.model.predict_proba(x, edge_index, edge_weight)
 
         # Test metrics
-        y_test = y[test_mask].cpu().numpy()
-        y_pred = predictions[test_mask].cpu().numpy()
+        y_test = y.index_select(0, test_index).cpu().numpy()
+        y_pred = predictions.index_select(0, test_index).cpu().numpy()
         y_pred_binary = (y_pred > 0.5).astype(int)
 
         auc = roc_auc_score(y_test, y_pred) if len(np.unique(y_test)) > 1 else 0.0
@@ -446,7 +690,7 @@ class GNNTrainer:
             'recall': recall,
             'f1_score': f1,
             'train_loss_final': train_losses[-1],
-            'val_loss_best': best_val_loss.item(),
+            'val_loss_best': best_val_loss,
             'epochs_trained': len(train_losses),
             'num_nodes': num_nodes,
             'num_edges': self.edge_index.shape[1],
@@ -464,35 +708,47 @@ class GNNTrainer:
 
         return self.metrics
 
-    def save_model_locally(self, path: str = "cascade_gcn_model.pkl") -> str:
-        """Save model and artifacts locally."""
+    def save_model_locally(self, path: str = "cascade_gcn_model") -> str:
+        """
+        Save model weights and metadata locally.
+
+        Weights go to <path>.safetensors (or <path>.pt, loadable with
+        weights_only=True, when safetensors is not installed); everything
+        else goes to <path>.json. Nothing is pickled.
+        """
         print(f"\nSaving model to {path}...")
 
-        artifacts = {
-            'model_state_dict': self.best_model_state,
-            'config': self.config,
-            'feature_mean': self.feature_mean,
-            'feature_std': self.feature_std,
-            'node_id_to_idx': self.node_id_to_idx,
-            'idx_to_node_id': self.idx_to_node_id,
+        state = {k: v.contiguous() for k, v in self.best_model_state.items()}
+        if SAFETENSORS_AVAILABLE:
+            weights_path = f"{path}.safetensors"
+            save_file(state, weights_path)
+        else:
+            weights_path = f"{path}.pt"
+            torch.save(state, weights_path)
+
+        metadata = {
+            'weights': os.path.basename(weights_path),
+            'config': asdict(self.config),
+            'feature_mean': self.feature_mean.tolist(),
+            'feature_std': self.feature_std.tolist(),
+            'node_ids': self.node_ids.tolist(),  # position = graph node index
             'metrics': self.metrics,
         }
+        with open(f"{path}.json", 'w') as f:
+            json.dump(metadata, f)
 
-        with open(path, 'wb') as f:
-            pickle.dump(artifacts, f)
-
-        print(f"  Saved model artifacts to {path}")
-        return path
+        print(f"  Saved model artifacts to {weights_path} and {path}.json")
+        return weights_path
 
     def get_predictions(self) -> pd.DataFrame:
         """Get cascade risk predictions for all nodes."""
         self.model.eval()
 
-        x = self.x.to(self.device)
-        edge_index = self.edge_index.to(self.device)
+        x = self.x.to(self.device, non_blocking=True)
+        edge_index = self.edge_index.to(self.device, non_blocking=True).long()
 
         with torch.no_grad():
-            predictions = self.model(x, edge_index).cpu().numpy()
+            predictions = self.model.predict_proba(x, edge_index).cpu().numpy()
 
         results_df = self.nodes_df[['NODE_ID', 'NODE_TYPE', 'CRITICALITY_SCORE']].copy()
         results_df['GNN_CASCADE_RISK'] = predictions
@@ -506,10 +762,19 @@ class GNNTrainer:
 
         predictions_df = self.get_predictions()
 
+        # Bulk load: write_pandas stages Parquet chunks with a parallel PUT and
+        # loads them with a single COPY INTO, replacing the table contents
         session = self.create_session()
-        snowpark_df = session.create_dataframe(predictions_df)
-        snowpark_df.write.mode("overwrite").save_as_table(
-            f"{DB}.{SCHEMA_CASCADE}.GNN_PREDICTIONS"
+        session.write_pandas(
+            predictions_df,
+            "GNN_PREDICTIONS",
+            database=DB,
+            schema=SCHEMA_CASCADE,
+            compression="snappy",
+            parallel=8,
+            auto_create_table=True,
+            overwrite=True,
+            use_logical_type=True,
         )
 
         print(f"  Written to {DB}.{SCHEMA_CASCADE}.GNN_PREDICTIONS")
@@ -529,11 +794,11 @@ class GNNTrainer:
             # Save model locally first
             model_path = self.save_model_locally()
 
-            # Log to registry
+            # Log to registry (wrapped, so inference returns probabilities)
             mv = registry.log_model(
                 model_name=MODEL_NAME,
                 version_name=MODEL_VERSION,
-                model=self.model,
+                model=CascadeGCNProbability(self.model),
                 comment=f"3-layer GCN for cascade failure prediction. AUC-ROC: {self.metrics['auc_roc']:.4f}",
                 metrics=self.metrics
             )
@@ -547,6 +812,25 @@ class GNNTrainer:
             self.save_model_locally()
 
 
+def load_model_artifacts(path: str = "cascade_gcn_model",
+                         device: str = "cpu") -> Tuple[Dict[str, torch.Tensor], Dict]:
+    """Load the weights and metadata written by GNNTrainer.save_model_locally()."""
+    with open(f"{path}.json") as f:
+        metadata = json.load(f)
+
+    weights_path = os.path.join(os.path.dirname(path), metadata['weights'])
+    if weights_path.endswith(".safetensors"):
+        if not SAFETENSORS_AVAILABLE:
+            raise ImportError(
+                f"{weights_path} is a safetensors file but safetensors is not installed. "
+                "Install with: pip install safetensors"
+            )
+        state = load_file(weights_path, device=device)
+    else:
+        state = torch.load(weights_path, map_location=device, weights_only=True)
+    return state, metadata
+
+
 def main():
     """Main training pipeline."""
     if not TORCH_AVAILABLE or not PYG_AVAILABLE:
@@ -559,6 +843,13 @@ def main():
     print("="*70)
     print(f"Device: {torch.device('cuda' if torch.cuda.is_available() else 'cpu')}")
 
+    # Graph shapes are static after build_graph(), so let cuDNN autotune
+    # once, and run FP32 matmuls on TF32 tensor cores (Ampere+)
+    torch.backends.cudnn.benchmark = True
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.allow_tf32 = True
+    torch.set_float32_matmul_precision('high')
+
     start_time = time.time()
 
     # Initialize trainer
@@ -22,11 +22,21 @@ import time
 import json
 import sys
 import numpy as np
-from collections import deque
-from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Set, Tuple, Any
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any
 from snowflake.snowpark import Session
 
+# Optional: compile the BFS core to machine code
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in: run the decorated function as plain Python."""
+        return lambda func: func
+
 # Import centralized configuration
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import DB, CONNECTION, SCHEMA_ML_DEMO, SCHEMA_CASCADE_ANALYSIS
@@ -35,9 +45,91 @@ from config import DB, CONNECTION, SCHEMA_ML_DEMO, SCHEMA_CASCADE_ANALYSIS
 CONNECTION_NAME = CONNECTION
 
 
+def temperature_stress(temperature_c: float) -> float:
+    """Failure-rate multiplier for ambient temperature (cold or heat stress)."""
+    if temperature_c < 0:
+        return 1.0 + abs(temperature_c) / 20.0  # Cold stress
+    elif temperature_c > 35:
+        return 1.0 + (temperature_c - 35) / 15.0  # Heat stress
+    return 1.0
+
+
+@njit(cache=True)
+def _bfs_cascade(indptr, indices, distances, edge_decay, criticality, vulnerability, p0_idx,
+                 global_scale, failure_threshold, max_waves, max_nodes):
+    """
+    BFS core of CascadeSimulator.simulate over the CSR adjacency.
+    
+    Same propagation rule as calculate_failure_probability, with its
+    input-only factors precomputed per edge (edge_decay) and per node
+    (vulnerability), and the scenario constants (temperature stress, load,
+    base scaling) folded into global_scale; each popped node scores its
+    whole neighbor block in one array expression. Returns parallel arrays for the failed nodes in
+    cascade order: node index, wave depth, triggering node index (-1 for
+    Patient Zero), failure probability, and the edge length it failed across.
+    """
+    n = len(indptr) - 1
+    failed = np.empty(n, dtype=np.int64)
+    wave = np.empty(n, dtype=np.int64)
+    trigger = np.empty(n, dtype=np.int64)
+    prob = np.empty(n, dtype=np.float64)
+    edge_km = np.empty(n, dtype=np.float64)
+    visited = np.zeros(n, dtype=np.bool_)
+    
+    failed[0] = p0_idx
+    wave[0] = 0
+    trigger[0] = -1
+    prob[0] = 1.0
+    edge_km[0] = 0.0
+    visited[p0_idx] = True
+    count = 1
+    
+    # failed[] doubles as the BFS queue: each failed node is enqueued once,
+    # in failure order, and head walks it front to back
+    head = 0
+    while head < count and count < max_nodes:
+        current = failed[head]
+        current_wave = wave[head]
+        head += 1
+        
+        if current_wave >= max_waves:
+            continue
+        
+        start, end = indptr[current], indptr[current + 1]
+        neighbors = indices[start:end]
+        source_scale = criticality[current] * global_scale
+        probs = np.minimum(0.95, edge_decay[start:end] * vulnerability[neighbors] * source_scale)
+        
+        # Only neighbors over the threshold need the sequential part;
+        # visited is re-checked per candidate since parallel edges can
+        # repeat a neighbor within one block
+        for j in np.flatnonzero(probs >= failure_threshold):
+            neighbor = neighbors[j]
+            if visited[neighbor]:
+                continue
+            
+            visited[neighbor] = True
+            failed[count] = neighbor
+            wave[count] = current_wave + 1
+            trigger[count] = current
+            prob[count] = probs[j]
+            edge_km[count] = distances[start + j]
+            count += 1
+    
+    return failed[:count], wave[:count], trigger[:count], prob[:count], edge_km[:count]
+
+
 @dataclass
 class CascadeNode:
     """Node in the cascade failure chain."""
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10+); slotted
+    # fields cannot carry class-level defaults, so every field is required
+    __slots__ = (
+        'node_id', 'node_name', 'node_type', 'lat', 'lon', 'capacity_kw',
+        'voltage_kv', 'criticality_score', 'downstream_transformers', 'order',
+        'wave_depth', 'triggered_by', 'failure_probability',
+    )
+    
     node_id: str
     node_name: str
     node_type: str
@@ -47,21 +139,55 @@ class CascadeNode:
     voltage_kv: float
     criticality_score: float
     downstream_transformers: int
-    order: int = 0
-    wave_depth: int = 0
-    triggered_by: Optional[str] = None
-    failure_probability: float = 0.0
+    order: int
+    wave_depth: int
+    triggered_by: Optional[str]
+    failure_probability: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat field dict; all fields are scalars, so no asdict() deep copy."""
+        return {
+            'node_id': self.node_id,
+            'node_name': self.node_name,
+            'node_type': self.node_type,
+            'lat': self.lat,
+            'lon': self.lon,
+            'capacity_kw': self.capacity_kw,
+            'voltage_kv': self.voltage_kv,
+            'criticality_score': self.criticality_score,
+            'downstream_transformers': self.downstream_transformers,
+            'order': self.order,
+            'wave_depth': self.wave_depth,
+            'triggered_by': self.triggered_by,
+            'failure_probability': self.failure_probability,
+        }
 
 
 @dataclass
 class WaveBreakdown:
     """Statistics for a single cascade wave."""
+    __slots__ = (
+        'wave_number', 'nodes_failed', 'capacity_lost_mw',
+        'customers_affected', 'substations', 'transformers',
+    )
+    
     wave_number: int
-    nodes_failed: int = 0
-    capacity_lost_mw: float = 0.0
-    customers_affected: int = 0
-    substations: int = 0
-    transformers: int = 0
+    nodes_failed: int
+    capacity_lost_mw: float
+    customers_affected: int
+    substations: int
+    transformers: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat field dict; all fields are scalars, so no asdict() deep copy."""
+        return {
+            'wave_number': self.wave_number,
+            'nodes_failed': self.nodes_failed,
+            'capacity_lost_mw': self.capacity_lost_mw,
+            'customers_affected': self.customers_affected,
+            'substations': self.substations,
+            'transformers': self.transformers,
+        }
 
 
 @dataclass
@@ -80,12 +206,19 @@ class CascadeResult:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to JSON-serializable dictionary."""
+        cascade_order = [n.to_dict() for n in self.cascade_order]
+        # Patient Zero heads the cascade order, reuse its dict
+        if self.cascade_order and self.cascade_order[0] is self.patient_zero:
+            patient_zero = cascade_order[0]
+        else:
+            patient_zero = self.patient_zero.to_dict()
+        
         return {
             'scenario_name': self.scenario_name,
-            'patient_zero': asdict(self.patient_zero),
-            'cascade_order': [asdict(n) for n in self.cascade_order],
+            'patient_zero': patient_zero,
+            'cascade_order': cascade_order,
             'propagation_paths': self.propagation_paths,
-            'wave_breakdown': [asdict(w) for w in self.wave_breakdown],
+            'wave_breakdown': [w.to_dict() for w in self.wave_breakdown],
             'total_affected_nodes': self.total_affected_nodes,
             'affected_capacity_mw': self.affected_capacity_mw,
             'estimated_customers_affected': self.estimated_customers_affected,
@@ -105,8 +238,23 @@ class CascadeSimulator:
     def __init__(self, session: Optional[Session] = None):
         """Initialize simulator with optional existing session."""
         self.session = session
-        self._nodes: Dict[str, Dict] = {}
-        self._adjacency: Dict[str, List[Tuple[str, float]]] = {}
+        # Integer node index <-> NODE_ID, and the adjacency in CSR form:
+        # neighbors of node i are _indices[_indptr[i]:_indptr[i + 1]], with
+        # matching edge lengths in _distances
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._distances = np.empty(0, dtype=np.float64)
+        # Scenario-independent inputs of the BFS core: per-node criticality
+        # and vulnerability (aligned with _node_ids), per-edge distance decay
+        # (aligned with _indices)
+        self._criticality = np.empty(0, dtype=np.float64)
+        self._vulnerability = np.empty(0, dtype=np.float64)
+        self._edge_decay = np.empty(0, dtype=np.float64)
+        # Remaining node attributes as parallel columns (also aligned with
+        # _node_ids); only read when building results, never by the BFS core
+        self._node_columns: Dict[str, np.ndarray] = {}
         self._centrality: Dict[str, Dict] = {}
         self._loaded = False
     
@@ -124,8 +272,9 @@ class CascadeSimulator:
         session = self._create_session()
         print("Loading grid topology...")
         
-        # Load nodes
-        nodes_df = session.sql(f"""
+        # Submit the node and edge queries together (block=False) so they run
+        # concurrently in Snowflake instead of as two serial round trips
+        nodes_job = session.sql(f"""
             SELECT 
                 n.NODE_ID,
                 n.NODE_NAME,
@@ -144,64 +293,93 @@ class CascadeSimulator:
             LEFT JOIN {DB}.{SCHEMA_CASCADE_ANALYSIS}.NODE_CENTRALITY_FEATURES c 
                 ON n.NODE_ID = c.NODE_ID
             WHERE n.LAT IS NOT NULL AND n.LON IS NOT NULL
-        """).to_pandas()
-        
-        self._nodes = {
-            row['NODE_ID']: {
-                'node_id': row['NODE_ID'],
-                'node_name': row['NODE_NAME'],
-                'node_type': row['NODE_TYPE'],
-                'lat': float(row['LAT']) if row['LAT'] else None,
-                'lon': float(row['LON']) if row['LON'] else None,
-                'capacity_kw': float(row['CAPACITY_KW'] or 0),
-                'voltage_kv': float(row['VOLTAGE_KV'] or 0),
-                'criticality_score': float(row['CRITICALITY_SCORE'] or 0),
-                'downstream_transformers': int(row['DOWNSTREAM_TRANSFORMERS'] or 0),
-                'betweenness': float(row['BETWEENNESS'] or 0),
-                'pagerank': float(row['PAGERANK'] or 0),
-                'cascade_risk': float(row['CASCADE_RISK'] or 0),
-            }
-            for _, row in nodes_df.iterrows()
+        """).to_pandas(block=False)
+        edges_job = session.sql(f"""
+            SELECT FROM_NODE_ID, TO_NODE_ID, DISTANCE_KM, EDGE_TYPE
+            FROM {DB}.{SCHEMA_ML_DEMO}.GRID_EDGES
+        """).to_pandas(block=False)
+        
+        # Load nodes
+        nodes_df = nodes_job.result()
+        
+        # Pull each column out once as a typed array and zip them, instead
+        # of boxing every cell through iterrows()
+        def numeric(df, column, fill):
+            return df[column].astype(np.float64).fillna(fill).to_numpy()
+        
+        node_ids = nodes_df['NODE_ID'].tolist()
+        self._criticality = numeric(nodes_df, 'CRITICALITY_SCORE', 0)
+        betweenness = numeric(nodes_df, 'BETWEENNESS', 0)
+        # Target vulnerability (betweenness = many paths go through it)
+        self._vulnerability = betweenness * 100 + 0.1
+        self._node_columns = {
+            'node_name': nodes_df['NODE_NAME'].to_numpy(dtype=object),
+            'node_type': nodes_df['NODE_TYPE'].to_numpy(dtype=object),
+            'lat': numeric(nodes_df, 'LAT', 0),
+            'lon': numeric(nodes_df, 'LON', 0),
+            'capacity_kw': numeric(nodes_df, 'CAPACITY_KW', 0),
+            'voltage_kv': numeric(nodes_df, 'VOLTAGE_KV', 0),
+            'criticality_score': self._criticality,
+            'downstream_transformers': numeric(nodes_df, 'DOWNSTREAM_TRANSFORMERS', 0).astype(np.int64),
+            'betweenness': betweenness,
+            'pagerank': numeric(nodes_df, 'PAGERANK', 0),
+            'cascade_risk': numeric(nodes_df, 'CASCADE_RISK', 0),
         }
-        print(f"  Loaded {len(self._nodes)} nodes")
+        print(f"  Loaded {len(node_ids)} nodes")
         
         # Load edges and build adjacency list
-        edges_df = session.sql(f"""
-            SELECT FROM_NODE_ID, TO_NODE_ID, DISTANCE_KM, EDGE_TYPE
-            FROM {DB}.{SCHEMA_ML_DEMO}.GRID_EDGES
-        """).to_pandas()
+        edges_df = edges_job.result()
         
-        self._adjacency = {}
-        for _, row in edges_df.iterrows():
-            from_node = row['FROM_NODE_ID']
-            to_node = row['TO_NODE_ID']
-            distance = float(row['DISTANCE_KM'] or 1.0)
-            
-            # Skip if nodes not in our node set
-            if from_node not in self._nodes or to_node not in self._nodes:
-                continue
-            
-            # Add bidirectional edges
-            if from_node not in self._adjacency:
-                self._adjacency[from_node] = []
-            if to_node not in self._adjacency:
-                self._adjacency[to_node] = []
-            
-            self._adjacency[from_node].append((to_node, distance))
-            self._adjacency[to_node].append((from_node, distance))
+        self._node_ids = node_ids
+        self._node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        
+        # Skip edges whose endpoints are not in our node set (index -1);
+        # a missing or zero distance counts as 1 km
+        from_idx = edges_df['FROM_NODE_ID'].map(self._node_index).fillna(-1).to_numpy(dtype=np.int64)
+        to_idx = edges_df['TO_NODE_ID'].map(self._node_index).fillna(-1).to_numpy(dtype=np.int64)
+        valid = (from_idx >= 0) & (to_idx >= 0)
+        distances = numeric(edges_df, 'DISTANCE_KM', 1.0)[valid]
+        distances[distances == 0] = 1.0
+        
+        # Bidirectional edges, interleaved so a stable sort by source keeps
+        # each node's neighbors in edge-table order
+        num_edges = int(valid.sum())
+        src = np.empty(2 * num_edges, dtype=np.int32)
+        dst = np.empty(2 * num_edges, dtype=np.int32)
+        src[0::2] = dst[1::2] = from_idx[valid]
+        src[1::2] = dst[0::2] = to_idx[valid]
+        order = np.argsort(src, kind='stable')
+        
+        self._indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=len(node_ids)))))
+        self._indices = dst[order]
+        self._distances = np.repeat(distances, 2)[order]
+        # Distance factor: exponential decay, 5km characteristic distance
+        self._edge_decay = np.exp(-self._distances / 5.0)
         
-        print(f"  Built adjacency list for {len(self._adjacency)} nodes")
+        print(f"  Built adjacency list for {np.count_nonzero(np.diff(self._indptr))} nodes")
         self._loaded = True
     
     def get_high_risk_nodes(self, limit: int = 20) -> List[Dict]:
         """Get top high-risk nodes for Patient Zero selection."""
         self.load_topology()
         
-        nodes = list(self._nodes.values())
         # Sort by cascade risk score (from centrality or criticality)
-        nodes.sort(key=lambda n: n['cascade_risk'], reverse=True)
+        top = np.argsort(-self._node_columns['cascade_risk'], kind='stable')[:limit]
         
-        return nodes[:limit]
+        return self._node_records(top)
+    
+    def _node_records(self, node_idx: np.ndarray) -> List[Dict]:
+        """Gather the node columns at node_idx into one dict per node."""
+        columns = {name: values[node_idx].tolist() for name, values in self._node_columns.items()}
+        # Zero coordinates were missing in the source
+        columns['lat'] = [lat or None for lat in columns['lat']]
+        columns['lon'] = [lon or None for lon in columns['lon']]
+        node_ids = [self._node_ids[i] for i in node_idx.tolist()]
+        
+        return [
+            {'node_id': node_id, **dict(zip(columns, values))}
+            for node_id, *values in zip(node_ids, *columns.values())
+        ]
     
     def calculate_failure_probability(
         self,
@@ -231,12 +409,7 @@ class CascadeSimulator:
         target_vulnerability = target_node['betweenness'] * 100 + 0.1
         
         # Temperature stress factor
-        if temperature_c < 0:
-            temp_stress = 1.0 + abs(temperature_c) / 20.0  # Cold stress
-        elif temperature_c > 35:
-            temp_stress = 1.0 + (temperature_c - 35) / 15.0  # Heat stress
-        else:
-            temp_stress = 1.0
+        temp_stress = temperature_stress(temperature_c)
         
         # Combined probability (capped at 0.95)
         prob = min(0.95, 
@@ -277,7 +450,7 @@ class CascadeSimulator:
         """
         self.load_topology()
         
-        if patient_zero_id not in self._nodes:
+        if patient_zero_id not in self._node_index:
             raise ValueError(f"Patient Zero {patient_zero_id} not found in topology")
         
         print(f"\nSimulating cascade from {patient_zero_id}...")
@@ -287,113 +460,82 @@ class CascadeSimulator:
         
         start_time = time.time()
         
-        # Initialize Patient Zero
-        p0_data = self._nodes[patient_zero_id]
-        patient_zero = CascadeNode(
-            node_id=p0_data['node_id'],
-            node_name=p0_data['node_name'],
-            node_type=p0_data['node_type'],
-            lat=p0_data['lat'],
-            lon=p0_data['lon'],
-            capacity_kw=p0_data['capacity_kw'],
-            voltage_kv=p0_data['voltage_kv'],
-            criticality_score=p0_data['criticality_score'],
-            downstream_transformers=p0_data['downstream_transformers'],
-            order=0,
-            wave_depth=0,
-            triggered_by=None,
-            failure_probability=1.0
+        p0_idx = self._node_index[patient_zero_id]
+        # Everything in the failure probability that is constant for the
+        # scenario: temperature stress x load x 0.5 base scaling factor
+        global_scale = 0.5 * load_multiplier * temperature_stress(temperature_c)
+        failed, waves, triggers, probs, edge_kms = _bfs_cascade(
+            self._indptr,
+            self._indices,
+            self._distances,
+            self._edge_decay,
+            self._criticality,
+            self._vulnerability,
+            p0_idx,
+            global_scale,
+            failure_threshold,
+            max_waves,
+            max_nodes
         )
         
-        # BFS queue: (node_id, wave_depth, triggered_by)
-        queue = deque([(patient_zero_id, 0, None)])
-        visited: Set[str] = {patient_zero_id}
-        
-        cascade_order: List[CascadeNode] = [patient_zero]
+        # Expand the BFS output into result records
+        cascade_order: List[CascadeNode] = []
         propagation_paths: List[Dict] = []
-        wave_stats: Dict[int, WaveBreakdown] = {0: WaveBreakdown(wave_number=0)}
-        
-        # Update wave 0 stats
-        wave_stats[0].nodes_failed = 1
-        wave_stats[0].capacity_lost_mw = p0_data['capacity_kw'] / 1000
-        wave_stats[0].customers_affected = p0_data['downstream_transformers'] * 50
-        if p0_data['node_type'] == 'SUBSTATION':
-            wave_stats[0].substations = 1
-        else:
-            wave_stats[0].transformers = 1
+        wave_stats: Dict[int, WaveBreakdown] = {}
         
-        # BFS cascade propagation
-        while queue and len(cascade_order) < max_nodes:
-            current_id, current_wave, triggered_by = queue.popleft()
-            
-            if current_wave >= max_waves:
-                continue
+        nodes = self._node_records(failed)
+        for order, (node, wave_num, trigger_idx, fail_prob, distance) in enumerate(zip(
+            nodes, waves.tolist(), triggers.tolist(), probs.tolist(), edge_kms.tolist()
+        )):
+            node_id = node['node_id']
+            triggered_by = self._node_ids[trigger_idx] if trigger_idx >= 0 else None
             
-            current_node = self._nodes[current_id]
+            cascade_order.append(CascadeNode(
+                node_id=node['node_id'],
+                node_name=node['node_name'],
+                node_type=node['node_type'],
+                lat=node['lat'],
+                lon=node['lon'],
+                capacity_kw=node['capacity_kw'],
+                voltage_kv=node['voltage_kv'],
+                criticality_score=node['criticality_score'],
+                downstream_transformers=node['downstream_transformers'],
+                order=order,
+                wave_depth=wave_num,
+                triggered_by=triggered_by,
+                failure_probability=fail_prob
+            ))
             
-            # Get neighbors
-            neighbors = self._adjacency.get(current_id, [])
+            # Record propagation path
+            if triggered_by is not None:
+                propagation_paths.append({
+                    'from_node': triggered_by,
+                    'to_node': node_id,
+                    'order': order,
+                    'distance_km': distance,
+                    'failure_probability': fail_prob
+                })
             
-            for neighbor_id, distance in neighbors:
-                if neighbor_id in visited:
-                    continue
-                
-                neighbor_node = self._nodes[neighbor_id]
-                
-                # Calculate failure probability
-                fail_prob = self.calculate_failure_probability(
-                    current_node,
-                    neighbor_node,
-                    distance,
-                    temperature_c,
-                    load_multiplier
+            # Update wave stats
+            if wave_num not in wave_stats:
+                wave_stats[wave_num] = WaveBreakdown(
+                    wave_number=wave_num,
+                    nodes_failed=0,
+                    capacity_lost_mw=0.0,
+                    customers_affected=0,
+                    substations=0,
+                    transformers=0
                 )
-                
-                if fail_prob >= failure_threshold:
-                    visited.add(neighbor_id)
-                    
-                    # Create cascade node
-                    cascade_node = CascadeNode(
-                        node_id=neighbor_node['node_id'],
-                        node_name=neighbor_node['node_name'],
-                        node_type=neighbor_node['node_type'],
-                        lat=neighbor_node['lat'],
-                        lon=neighbor_node['lon'],
-                        capacity_kw=neighbor_node['capacity_kw'],
-                        voltage_kv=neighbor_node['voltage_kv'],
-                        criticality_score=neighbor_node['criticality_score'],
-                        downstream_transformers=neighbor_node['downstream_transformers'],
-                        order=len(cascade_order),
-                        wave_depth=current_wave + 1,
-                        triggered_by=current_id,
-                        failure_probability=fail_prob
-                    )
-                    cascade_order.append(cascade_node)
-                    
-                    # Record propagation path
-                    propagation_paths.append({
-                        'from_node': current_id,
-                        'to_node': neighbor_id,
-                        'order': len(cascade_order) - 1,
-                        'distance_km': distance,
-                        'failure_probability': fail_prob
-                    })
-                    
-                    # Update wave stats
-                    wave_num = current_wave + 1
-                    if wave_num not in wave_stats:
-                        wave_stats[wave_num] = WaveBreakdown(wave_number=wave_num)
-                    
-                    wave_stats[wave_num].nodes_failed += 1
-                    wave_stats[wave_num].capacity_lost_mw += neighbor_node['capacity_kw'] / 1000
-                    wave_stats[wave_num].customers_affected += neighbor_node['downstream_transformers'] * 50
-                    if neighbor_node['node_type'] == 'SUBSTATION':
-                        wave_stats[wave_num].substations += 1
-                    else:
-                        wave_stats[wave_num].transformers += 1
-                    
-                    # Add to queue
-                    queue.append((neighbor_id, current_wave + 1, current_id))
+            
+            wave_stats[wave_num].nodes_failed += 1
+            wave_stats[wave_num].capacity_lost_mw += node['capacity_kw'] / 1000
+            wave_stats[wave_num].customers_affected += node['downstream_transformers'] * 50
+            if node['node_type'] == 'SUBSTATION':
+                wave_stats[wave_num].substations += 1
+            else:
+                wave_stats[wave_num].transformers += 1
+        
+        patient_zero = cascade_order[0]
         
         # Build result
         total_capacity = sum(n.capacity_kw for n in cascade_order) / 1000
@@ -428,37 +570,46 @@ class CascadeSimulator:
         
         scenario_id = f"{result.scenario_name.lower().replace(' ', '_')}_{int(time.time())}"
         
-        # Convert to JSON strings
-        cascade_order_json = json.dumps([asdict(n) for n in result.cascade_order])
-        wave_breakdown_json = json.dumps([asdict(w) for w in result.wave_breakdown])
-        propagation_paths_json = json.dumps(result.propagation_paths)
+        # Convert to JSON strings (one serialization pass over the result)
+        payload = result.to_dict()
+        cascade_order_json = json.dumps(payload['cascade_order'])
+        wave_breakdown_json = json.dumps(payload['wave_breakdown'])
+        propagation_paths_json = json.dumps(payload['propagation_paths'])
         params_json = json.dumps({
             'scenario_name': result.scenario_name,
             'max_cascade_depth': result.max_cascade_depth
         })
         
+        # Bind variables instead of inlining the payloads: the statement text
+        # stays constant across scenarios, names and JSON can't break out of
+        # the literal quoting, and PARSE_JSON needs INSERT ... SELECT since
+        # VALUES only accepts constants
         session.sql(f"""
             INSERT INTO {DB}.{SCHEMA_CASCADE_ANALYSIS}.PRECOMPUTED_CASCADES (
                 scenario_id, scenario_name, patient_zero_id, patient_zero_name,
                 simulation_params, cascade_order, wave_breakdown, propagation_paths,
                 total_affected_nodes, affected_capacity_mw, estimated_customers_affected,
                 max_cascade_depth, simulation_timestamp
-            ) VALUES (
-                '{scenario_id}',
-                '{result.scenario_name}',
-                '{result.patient_zero.node_id}',
-                '{result.patient_zero.node_name}',
-                PARSE_JSON('{params_json}'),
-                PARSE_JSON($${cascade_order_json}$$),
-                PARSE_JSON($${wave_breakdown_json}$$),
-                PARSE_JSON($${propagation_paths_json}$$),
-                {result.total_affected_nodes},
-                {result.affected_capacity_mw},
-                {result.estimated_customers_affected},
-                {result.max_cascade_depth},
-                CURRENT_TIMESTAMP()
             )
-        """).collect()
+            SELECT
+                ?, ?, ?, ?,
+                PARSE_JSON(?), PARSE_JSON(?), PARSE_JSON(?), PARSE_JSON(?),
+                ?, ?, ?,
+                ?, CURRENT_TIMESTAMP()
+        """, params=[
+            scenario_id,
+            result.scenario_name,
+            result.patient_zero.node_id,
+            result.patient_zero.node_name,
+            params_json,
+            cascade_order_json,
+            wave_breakdown_json,
+            propagation_paths_json,
+            result.total_affected_nodes,
+            result.affected_capacity_mw,
+            result.estimated_customers_affected,
+            result.max_cascade_depth,
+        ]).collect()
         
         print(f"  Stored result as scenario_id: {scenario_id}")
         return scenario_id
@@ -210,22 +210,30 @@ def compute_neighborhood_reach(G, max_hops=3):
     reach = {}
     nodes = list(G.nodes())
     
+    # Integer-indexed adjacency so the BFS never hashes node ID strings
+    node_index = {node: i for i, node in enumerate(nodes)}
+    adjacency = [[node_index[nb] for nb in G.neighbors(node)] for node in nodes]
+    
+    # visited_by[j] == i marks j as visited in the BFS from node i, so the
+    # array never needs clearing between sources
+    visited_by = [-1] * len(nodes)
+    
     for i, node in enumerate(nodes):
         if i % 1000 == 0:
             print(f"  Processing node {i}/{len(nodes)}...")
         
         # BFS to find k-hop neighborhood
         hop_counts = {0: 1}  # Distance 0 is just the node itself
-        visited = {node}
-        frontier = {node}
+        visited_by[i] = i
+        frontier = [i]
         
         for hop in range(1, max_hops + 1):
-            next_frontier = set()
+            next_frontier = []
             for n in frontier:
-                for neighbor in G.neighbors(n):
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        next_frontier.add(neighbor)
+                for neighbor in adjacency[n]:
+                    if visited_by[neighbor] != i:
+                        visited_by[neighbor] = i
+                        next_frontier.append(neighbor)
             hop_counts[hop] = len(next_frontier)
             frontier = next_frontier
             
@@ -35,6 +35,11 @@ Usage:
     
     # Use local data files (skip download):
     python load_postgis_data.py --service flux_ops_postgres --local-data ./data/postgis_exports
+    
+    # Upgrading: add new columns/indexes to an existing database in place.
+    # Run this BEFORE deploying a newer API server (e.g. the nearest-line
+    # endpoints read power_lines_spatial.geom_m); no data is reloaded.
+    python load_postgis_data.py --service flux_ops_postgres --migrate-only
 """
 
 import argparse
@@ -160,7 +165,10 @@ SCHEMAS = {
             geom GEOMETRY(LineString, 4326),
             centroid_lat DOUBLE PRECISION,
             centroid_lon DOUBLE PRECISION,
-            created_at TIMESTAMP DEFAULT NOW()
+            created_at TIMESTAMP DEFAULT NOW(),
+            -- UTM zone 15N (meters) copy of geom for planar distance/KNN math
+            geom_m GEOMETRY(LineString, 32615)
+                GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED
         );
     """,
     "power_lines_spatial": """
@@ -174,7 +182,10 @@ SCHEMAS = {
             length_meters DOUBLE PRECISION,
             centroid_lon DOUBLE PRECISION,
             centroid_lat DOUBLE PRECISION,
-            geom GEOMETRY(LineString, 4326)
+            geom GEOMETRY(LineString, 4326),
+            -- UTM zone 15N (meters) copy of geom for planar distance/KNN math
+            geom_m GEOMETRY(LineString, 32615)
+                GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED
         );
     """,
     "vegetation_risk": """
@@ -195,7 +206,10 @@ SCHEMAS = {
             clearance_deficit_m DOUBLE PRECISION,
             years_to_encroachment DOUBLE PRECISION,
             data_source VARCHAR(100),
-            geom GEOMETRY(Point, 4326)
+            geom GEOMETRY(Point, 4326),
+            -- UTM zone 15N (meters) copy of geom for planar distance/KNN math
+            geom_m GEOMETRY(Point, 32615)
+                GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED
         );
     """,
     "substations": """
@@ -302,6 +316,56 @@ SCHEMAS = {
     """,
 }
 
+# Tables whose heap is rewritten in spatial order after loading, so KNN probes
+# from vegetation_risk_computed hit neighbouring pages instead of random ones.
+# SP-GiST is not clusterable, so point tables cluster on a geohash btree: trees
+# that are neighbours on disk are neighbours on the map, and each parallel
+# worker's block range of the driving scan becomes a compact spatial tile.
+CLUSTER_INDEXES = {
+    "grid_power_lines": "idx_grid_power_lines_geom",
+    "power_lines_spatial": "idx_power_lines_spatial_geom",
+    "vegetation_risk": "idx_vegetation_geohash",
+    "grid_assets_cache": "idx_grid_assets_geohash",
+}
+
+# Columns added to tables after their first data release. load_layer gets them
+# from SCHEMAS when it recreates a table; these statements bring a database
+# loaded earlier up to date in place, so an upgraded API server that reads
+# them never hits a missing column. Each is idempotent.
+COLUMN_MIGRATIONS = {
+    "power_lines_spatial": [
+        """ALTER TABLE power_lines_spatial ADD COLUMN IF NOT EXISTS geom_m GEOMETRY(LineString, 32615)
+            GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED;""",
+        "CREATE INDEX IF NOT EXISTS idx_power_lines_spatial_geom_m ON power_lines_spatial USING GIST (geom_m);",
+    ],
+    "grid_power_lines": [
+        """ALTER TABLE grid_power_lines ADD COLUMN IF NOT EXISTS geom_m GEOMETRY(LineString, 32615)
+            GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED;""",
+        "CREATE INDEX IF NOT EXISTS idx_grid_power_lines_geom_m ON grid_power_lines USING GIST (geom_m);",
+    ],
+    "vegetation_risk": [
+        """ALTER TABLE vegetation_risk ADD COLUMN IF NOT EXISTS geom_m GEOMETRY(Point, 32615)
+            GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED;""",
+        "CREATE INDEX IF NOT EXISTS idx_vegetation_geom_m ON vegetation_risk USING GIST (geom_m);",
+    ],
+}
+
+# Source tables read by each materialized view in DERIVED_VIEWS, used to
+# skip rebuilding a view whose inputs have not changed
+MATERIALIZED_VIEW_SOURCES = {
+    "vegetation_risk_computed": ["vegetation_risk", "grid_power_lines", "grid_assets_cache"],
+}
+
+# Bookkeeping table recording the source data version each materialized
+# view was built from (see source_data_version)
+VIEW_VERSIONS_TABLE = "derived_view_versions"
+
+# Cached intermediate results (KNN probes) each materialized view builds on.
+# They survive a plain rebuild and are dropped only when stale.
+MATERIALIZED_VIEW_CACHES = {
+    "vegetation_risk_computed": ["tree_nearest_line", "tree_nearest_asset"],
+}
+
 # Spatial indexes for each table
 INDEXES = {
     "building_footprints": [
@@ -313,16 +377,24 @@ INDEXES = {
     ],
     "grid_power_lines": [
         "CREATE INDEX IF NOT EXISTS idx_grid_power_lines_geom ON grid_power_lines USING GIST (geom);",
+        "CREATE INDEX IF NOT EXISTS idx_grid_power_lines_geom_m ON grid_power_lines USING GIST (geom_m);",
         "CREATE INDEX IF NOT EXISTS idx_grid_power_lines_circuit ON grid_power_lines (circuit_id);",
         "CREATE INDEX IF NOT EXISTS idx_grid_power_lines_substation ON grid_power_lines (substation_id);",
         "CREATE INDEX IF NOT EXISTS idx_grid_power_lines_type ON grid_power_lines (line_type);",
     ],
     "power_lines_spatial": [
         "CREATE INDEX IF NOT EXISTS idx_power_lines_spatial_geom ON power_lines_spatial USING GIST (geom);",
+        "CREATE INDEX IF NOT EXISTS idx_power_lines_spatial_geom_m ON power_lines_spatial USING GIST (geom_m);",
         "CREATE INDEX IF NOT EXISTS idx_power_lines_spatial_class ON power_lines_spatial (class);",
     ],
     "vegetation_risk": [
-        "CREATE INDEX IF NOT EXISTS idx_vegetation_geom ON vegetation_risk USING GIST (geom);",
+        # Point data only read by bbox predicates (ST_DWithin/&&) and as the
+        # outer side of KNN probes: SP-GiST's non-overlapping partitions prune
+        # those well and index smaller than GiST. Tables probed with <->
+        # ORDER BY keep GiST.
+        "CREATE INDEX IF NOT EXISTS idx_vegetation_geom_spgist ON vegetation_risk USING SPGIST (geom);",
+        "CREATE INDEX IF NOT EXISTS idx_vegetation_geohash ON vegetation_risk (ST_GeoHash(geom, 10));",
+        "CREATE INDEX IF NOT EXISTS idx_vegetation_geom_m ON vegetation_risk USING GIST (geom_m);",
         "CREATE INDEX IF NOT EXISTS idx_vegetation_risk ON vegetation_risk (risk_level);",
     ],
     "substations": [
@@ -342,7 +414,13 @@ INDEXES = {
         "CREATE INDEX IF NOT EXISTS idx_meters_transformer ON meter_locations_enhanced (transformer_id);",
     ],
     "grid_assets_cache": [
+        # GiST, not SP-GiST: assets are the inner side of KNN (<->) ORDER BY
+        # probes, which PostGIS serves index-ordered from GiST
         "CREATE INDEX IF NOT EXISTS idx_grid_assets_geom ON grid_assets_cache USING GIST (geom);",
+        "CREATE INDEX IF NOT EXISTS idx_grid_assets_geohash ON grid_assets_cache (ST_GeoHash(geom, 10));",
+        # KNN probe for vegetation_risk_computed's nearest infrastructure asset;
+        # the predicate must match the view's asset_type filter exactly
+        "CREATE INDEX IF NOT EXISTS idx_grid_assets_infra_geom ON grid_assets_cache USING GIST (geom) WHERE asset_type IN ('transformer', 'substation', 'pole');",
         "CREATE INDEX IF NOT EXISTS idx_assets_type ON grid_assets_cache (asset_type);",
         "CREATE INDEX IF NOT EXISTS idx_assets_circuit ON grid_assets_cache (circuit_id);",
         "CREATE INDEX IF NOT EXISTS idx_cache_type_health ON grid_assets_cache (asset_type, health_score);",
@@ -405,6 +483,101 @@ DERIVED_VIEWS = {
     #    This is the CRITICAL view that computes vegetation risk based on
     #    proximity to power lines using PostGIS spatial joins.
     "vegetation_risk_computed": """
+        -- Each tree runs two KNN (<->) probes; without a GiST index on the
+        -- exact probed expression (and predicate) they become full scans.
+        -- Idempotent, so a views-only rebuild is still index-backed.
+        -- vegetation_risk.geom is only the outer side of the probes and is
+        -- otherwise hit with bbox predicates, so it uses SP-GiST; the assets
+        -- are the KNN-ordered inner side and keep GiST. Indexes from earlier
+        -- layouts are dropped so they stop costing writes (including the
+        -- short-lived SP-GiST asset indexes and the unused placeholder-line
+        -- partial index).
+        DROP INDEX IF EXISTS idx_vegetation_geom;
+        DROP INDEX IF EXISTS idx_grid_assets_infra_geom_spgist;
+        DROP INDEX IF EXISTS idx_grid_assets_geom_spgist;
+        DROP INDEX IF EXISTS idx_vegetation_placeholder_line;
+        CREATE INDEX IF NOT EXISTS idx_vegetation_geom_spgist ON vegetation_risk USING SPGIST (geom);
+        CREATE INDEX IF NOT EXISTS idx_grid_power_lines_geom ON grid_power_lines USING GIST (geom);
+        -- Databases loaded before grid_power_lines / vegetation_risk gained
+        -- their projected copies (both are read by the tree_nearest_line probe)
+        ALTER TABLE grid_power_lines ADD COLUMN IF NOT EXISTS geom_m GEOMETRY(LineString, 32615)
+            GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED;
+        CREATE INDEX IF NOT EXISTS idx_grid_power_lines_geom_m ON grid_power_lines USING GIST (geom_m);
+        ALTER TABLE vegetation_risk ADD COLUMN IF NOT EXISTS geom_m GEOMETRY(Point, 32615)
+            GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED;
+        CREATE INDEX IF NOT EXISTS idx_vegetation_geom_m ON vegetation_risk USING GIST (geom_m);
+        CREATE INDEX IF NOT EXISTS idx_grid_assets_geom ON grid_assets_cache USING GIST (geom);
+        CREATE INDEX IF NOT EXISTS idx_grid_assets_infra_geom ON grid_assets_cache USING GIST (geom)
+            WHERE asset_type IN ('transformer', 'substation', 'pole');
+        ANALYZE vegetation_risk;
+        ANALYZE grid_power_lines;
+        ANALYZE grid_assets_cache;
+
+        -- The per-tree KNN laterals are independent, so let the planner
+        -- split the vegetation_risk scan across parallel workers (bounded
+        -- server-side by max_parallel_workers). SET LOCAL scopes this to the
+        -- implicit transaction psql wraps around this block.
+        SET LOCAL max_parallel_workers_per_gather = 8;
+        -- The cost is all in PostGIS function calls, which JIT cannot
+        -- inline; its compile time would be pure overhead
+        SET LOCAL jit = off;
+
+        -- KNN results are cached in their own materialized views, keyed by
+        -- tree_id. IF NOT EXISTS reuses them across risk-view rebuilds; they
+        -- only go away (via DROP TABLE ... CASCADE) when one of their own
+        -- source layers is reloaded, so e.g. reloading grid_assets_cache
+        -- re-probes assets but keeps the nearest-line results.
+        --
+        -- Lines are probed on the UTM 15N (meters) columns: <-> order is
+        -- then true nearest-by-meters, so one KNN hit is the answer and the
+        -- distance is a planar sqrt instead of a spheroid solve. The radius
+        -- (beyond it every risk tier resolves to 'safe') is index-backed;
+        -- trees with no line in range get no row and fall through to 'safe'
+        -- with a NULL distance.
+        CREATE MATERIALIZED VIEW IF NOT EXISTS tree_nearest_line AS
+        SELECT
+            v.tree_id,
+            p.line_id AS nearest_line_id,
+            p.voltage_class AS nearest_line_class,
+            p.distance_to_line_m
+        FROM vegetation_risk v
+        CROSS JOIN LATERAL (
+            SELECT
+                line_id,
+                voltage_class,
+                ST_Distance(v.geom_m, geom_m) AS distance_to_line_m
+            FROM grid_power_lines
+            WHERE ST_DWithin(geom_m, v.geom_m, GREATEST(200, COALESCE(v.height_m, 0) * 2))
+            ORDER BY v.geom_m <-> geom_m
+            LIMIT 1
+        ) p
+        WHERE v.geom IS NOT NULL;
+        -- Unique key allows REFRESH MATERIALIZED VIEW CONCURRENTLY
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tree_nearest_line_tree ON tree_nearest_line (tree_id);
+
+        CREATE MATERIALIZED VIEW IF NOT EXISTS tree_nearest_asset AS
+        SELECT
+            v.tree_id,
+            ga.asset_type AS nearest_asset_type,
+            ga.distance_to_asset_m
+        FROM vegetation_risk v
+        CROSS JOIN LATERAL (
+            SELECT
+                c.asset_type,
+                ST_Distance(v.geom::geography, c.geom::geography) AS distance_to_asset_m
+            FROM (
+                SELECT asset_type, geom
+                FROM grid_assets_cache
+                WHERE asset_type IN ('transformer', 'substation', 'pole')
+                ORDER BY v.geom <-> geom
+                LIMIT 10
+            ) c
+            ORDER BY distance_to_asset_m
+            LIMIT 1
+        ) ga
+        WHERE v.geom IS NOT NULL;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tree_nearest_asset_tree ON tree_nearest_asset (tree_id);
+
         DROP MATERIALIZED VIEW IF EXISTS vegetation_risk_computed CASCADE;
         CREATE MATERIALIZED VIEW vegetation_risk_computed AS
         WITH vegetation_with_coords AS (
@@ -418,102 +591,93 @@ DERIVED_VIEWS = {
                 canopy_radius_m,
                 risk_score AS base_risk_score,
                 risk_level AS base_risk_level,
-                geom
+                -- Fall zone = height * 1.3 (safety factor for wind/lean); the
+                -- 2x band is the warning tier. Computed once per tree here.
+                height_m * 1.3 AS fall_zone_m,
+                height_m * 2.0 AS warning_zone_m
             FROM vegetation_risk
             WHERE geom IS NOT NULL
         ),
-        nearest_powerline AS (
-            SELECT DISTINCT ON (v.tree_id)
-                v.tree_id,
-                p.line_id AS nearest_line_id,
-                p.voltage_class AS nearest_line_class,
-                p.line_type AS nearest_line_type,
-                ST_Distance(v.geom::geography, p.geom::geography) AS distance_to_line_m
+        -- Classify each tree once; score and explanation below key off the
+        -- tier instead of re-evaluating the same distance thresholds.
+        classified AS (
+            SELECT
+                v.*,
+                np.distance_to_line_m,
+                np.nearest_line_id,
+                np.nearest_line_class,
+                na.nearest_asset_type,
+                na.distance_to_asset_m,
+                CASE
+                    WHEN np.distance_to_line_m <= v.fall_zone_m THEN 'critical'
+                    WHEN np.distance_to_line_m <= v.warning_zone_m THEN 'warning'
+                    WHEN np.distance_to_line_m <= 50 THEN 'monitor'
+                    ELSE 'safe'
+                END AS risk_level
             FROM vegetation_with_coords v
-            CROSS JOIN LATERAL (
-                SELECT line_id, voltage_class, line_type, geom
-                FROM grid_power_lines
-                ORDER BY v.geom <-> geom
-                LIMIT 1
-            ) p
-        ),
-        nearest_asset AS (
-            SELECT DISTINCT ON (v.tree_id)
-                v.tree_id,
-                ga.asset_type AS nearest_asset_type,
-                ga.asset_id AS nearest_asset_id,
-                ST_Distance(v.geom::geography, ga.geom::geography) AS distance_to_asset_m
-            FROM vegetation_with_coords v
-            CROSS JOIN LATERAL (
-                SELECT asset_id, asset_type, geom
-                FROM grid_assets_cache
-                WHERE asset_type IN ('transformer', 'substation', 'pole')
-                ORDER BY v.geom <-> geom
-                LIMIT 1
-            ) ga
+            LEFT JOIN tree_nearest_line np ON v.tree_id = np.tree_id
+            LEFT JOIN tree_nearest_asset na ON v.tree_id = na.tree_id
         )
         SELECT 
-            v.tree_id,
-            v.class AS species,
-            v.subtype,
-            v.longitude,
-            v.latitude,
-            v.height_m,
-            v.canopy_radius_m,
-            -- Fall zone = height * 1.3 (safety factor for wind/lean)
-            ROUND((v.height_m * 1.3)::numeric, 2) AS fall_zone_m,
+            c.tree_id,
+            c.class AS species,
+            c.subtype,
+            c.longitude,
+            c.latitude,
+            c.height_m,
+            c.canopy_radius_m,
+            ROUND(c.fall_zone_m::numeric, 2) AS fall_zone_m,
             -- Distance to nearest power line
-            ROUND(np.distance_to_line_m::numeric, 2) AS distance_to_line_m,
-            np.nearest_line_id,
-            np.nearest_line_class,
+            ROUND(c.distance_to_line_m::numeric, 2) AS distance_to_line_m,
+            c.nearest_line_id,
+            c.nearest_line_class,
             -- Distance to nearest grid asset
-            na.nearest_asset_type,
-            na.nearest_asset_id,
-            ROUND(na.distance_to_asset_m::numeric, 2) AS distance_to_asset_m,
+            c.nearest_asset_type,
+            ROUND(c.distance_to_asset_m::numeric, 2) AS distance_to_asset_m,
             -- Compute actual risk score based on proximity
-            CASE
-                WHEN np.distance_to_line_m <= (v.height_m * 1.3) THEN 
-                    LEAST(1.0, 0.85 + (1 - np.distance_to_line_m / (v.height_m * 1.3)) * 0.15)
-                WHEN np.distance_to_line_m <= (v.height_m * 2.0) THEN 
-                    0.5 + (1 - np.distance_to_line_m / (v.height_m * 2.0)) * 0.3
-                WHEN np.distance_to_line_m <= 50 THEN 
-                    0.2 + (1 - np.distance_to_line_m / 50) * 0.2
+            CASE c.risk_level
+                WHEN 'critical' THEN 
+                    LEAST(1.0, 0.85 + (1 - c.distance_to_line_m / NULLIF(c.fall_zone_m, 0)) * 0.15)
+                WHEN 'warning' THEN 
+                    0.5 + (1 - c.distance_to_line_m / NULLIF(c.warning_zone_m, 0)) * 0.3
+                WHEN 'monitor' THEN 
+                    0.2 + (1 - c.distance_to_line_m / 50) * 0.2
                 ELSE 
-                    GREATEST(0.05, v.base_risk_score * 0.5)
+                    GREATEST(0.05, c.base_risk_score * 0.5)
             END AS risk_score,
-            -- Risk level based on computed score
-            CASE
-                WHEN np.distance_to_line_m <= (v.height_m * 1.3) THEN 'critical'
-                WHEN np.distance_to_line_m <= (v.height_m * 2.0) THEN 'warning'
-                WHEN np.distance_to_line_m <= 50 THEN 'monitor'
-                ELSE 'safe'
-            END AS risk_level,
-            -- Human-readable explanation
-            CASE
-                WHEN np.distance_to_line_m <= (v.height_m * 1.3) THEN 
-                    'CRITICAL: Tree fall zone (' || ROUND((v.height_m * 1.3)::numeric, 1) || 'm) reaches ' || 
-                    COALESCE(np.nearest_line_class, 'power line') || ' at ' || ROUND(np.distance_to_line_m::numeric, 1) || 'm'
-                WHEN np.distance_to_line_m <= (v.height_m * 2.0) THEN 
-                    'WARNING: ' || COALESCE(np.nearest_line_class, 'Power line') || ' at ' || 
-                    ROUND(np.distance_to_line_m::numeric, 1) || 'm is within 2x fall zone'
-                WHEN np.distance_to_line_m <= 50 THEN 
-                    'MONITOR: ' || COALESCE(np.nearest_line_class, 'Power line') || ' at ' || 
-                    ROUND(np.distance_to_line_m::numeric, 1) || 'm - within monitoring distance'
+            c.risk_level,
+            -- Human-readable explanation (one format() call per row rather
+            -- than a chain of || concatenations)
+            CASE c.risk_level
+                WHEN 'critical' THEN 
+                    format('CRITICAL: Tree fall zone (%sm) reaches %s at %sm',
+                           ROUND(c.fall_zone_m::numeric, 1),
+                           COALESCE(c.nearest_line_class, 'power line'),
+                           ROUND(c.distance_to_line_m::numeric, 1))
+                WHEN 'warning' THEN 
+                    format('WARNING: %s at %sm is within 2x fall zone',
+                           COALESCE(c.nearest_line_class, 'Power line'),
+                           ROUND(c.distance_to_line_m::numeric, 1))
+                WHEN 'monitor' THEN 
+                    format('MONITOR: %s at %sm - within monitoring distance',
+                           COALESCE(c.nearest_line_class, 'Power line'),
+                           ROUND(c.distance_to_line_m::numeric, 1))
                 ELSE 
                     'Safe distance from power infrastructure'
             END AS risk_explanation,
             NOW() AS computed_at
-        FROM vegetation_with_coords v
-        LEFT JOIN nearest_powerline np ON v.tree_id = np.tree_id
-        LEFT JOIN nearest_asset na ON v.tree_id = na.tree_id;
+        FROM classified c;
 
         -- Create indexes on the materialized view for fast queries
         CREATE INDEX IF NOT EXISTS idx_veg_computed_risk ON vegetation_risk_computed (risk_level);
         CREATE INDEX IF NOT EXISTS idx_veg_computed_score ON vegetation_risk_computed (risk_score DESC);
         CREATE INDEX IF NOT EXISTS idx_veg_computed_coords ON vegetation_risk_computed (longitude, latitude);
+        -- Fresh MV has no planner stats; gather them in the same transaction
+        ANALYZE vegetation_risk_computed;
         
         COMMENT ON MATERIALIZED VIEW vegetation_risk_computed IS 
-            'Pre-computed vegetation risk with spatial analysis - refresh with REFRESH MATERIALIZED VIEW vegetation_risk_computed';
+            'Pre-computed vegetation risk with spatial analysis - refresh with REFRESH MATERIALIZED VIEW vegetation_risk_computed '
+            '(after REFRESH MATERIALIZED VIEW CONCURRENTLY tree_nearest_line / tree_nearest_asset if their sources changed)';
     """,
     
     # 4. power_lines_spatial - NOW LOADED DIRECTLY FROM GITHUB RELEASE
@@ -847,6 +1011,12 @@ def load_layer(layer_key: str, data_dir: Path, conn_args: list) -> bool:
         if not run_psql(idx_sql, conn_args, "Create index"):
             return False
     
+    # Order the heap along the spatial index (one rewrite at load time)
+    cluster_index = CLUSTER_INDEXES.get(table)
+    if cluster_index:
+        print(f"  Clustering on {cluster_index}...")
+        run_psql(f"CLUSTER {table} USING {cluster_index};", conn_args, "Cluster table")
+    
     # Verify row count
     print(f"  Verifying load...")
     count_sql = f"SELECT COUNT(*) FROM {table};"
@@ -866,7 +1036,100 @@ def load_layer(layer_key: str, data_dir: Path, conn_args: list) -> bool:
     return True
 
 
-def create_derived_views(conn_args: list) -> bool:
+def migrate_existing_tables(conn_args: list) -> bool:
+    """Apply COLUMN_MIGRATIONS to every listed table that already exists."""
+    print(f"\n{'='*60}")
+    print("Migrating existing tables")
+    print(f"{'='*60}")
+    
+    all_ok = True
+    for table, statements in COLUMN_MIGRATIONS.items():
+        # Only plain tables; not loaded yet (or an old view) means nothing to do
+        kind_sql = f"SELECT relkind FROM pg_class WHERE oid = to_regclass('{table}');"
+        cmd = ["psql"] + conn_args + ["-t", "-A", "-c", kind_sql]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0 or result.stdout.strip() != "r":
+            print(f"  {table}: not loaded, skipping")
+            continue
+        
+        print(f"  {table}...")
+        for sql in statements:
+            if not run_psql(sql, conn_args, f"Migrate {table}"):
+                all_ok = False
+                break
+    
+    return all_ok
+
+
+def source_data_version(view_name: str, conn_args: list) -> str:
+    """
+    Fingerprint the current contents of a materialized view's source tables.
+    
+    Each source contributes its row count and newest row version (max xmin):
+    an insert or update writes tuples with a newer xmin and a delete lowers
+    the count, so any in-place change yields a different string. Unlike the
+    pg_stat counters this survives manual ANALYZE and statistics resets.
+    Returns "" if the tables cannot be read.
+    """
+    parts = [
+        f"(SELECT format('%s:%s:%s', '{table}', COUNT(*), MAX(xmin::text::bigint)) FROM {table})"
+        for table in MATERIALIZED_VIEW_SOURCES[view_name]
+    ]
+    version_sql = f"SELECT concat_ws(';', {', '.join(parts)});"
+    cmd = ["psql"] + conn_args + ["-t", "-A", "-c", version_sql]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return ""
+    return result.stdout.strip()
+
+
+def materialized_view_state(view_name: str, source_version: str, conn_args: list) -> str:
+    """
+    Check whether a materialized view can be reused instead of rebuilt.
+    
+    Returns "current", "stale" or "missing". load_layer recreates source
+    tables with DROP TABLE ... CASCADE, which also drops the view, so a
+    view that still exists is current only if the source_data_version
+    recorded when it was built matches source_version. A view with no
+    recorded version (built by an older loader) counts as stale.
+    """
+    exists_sql = f"SELECT to_regclass('{view_name}') IS NOT NULL;"
+    cmd = ["psql"] + conn_args + ["-t", "-A", "-c", exists_sql]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0 or result.stdout.strip() != "t":
+        return "missing"
+    
+    if not source_version:
+        return "stale"
+    
+    # Fails (and so reads as stale) until the versions table exists
+    recorded_sql = f"SELECT source_version FROM {VIEW_VERSIONS_TABLE} WHERE view_name = '{view_name}';"
+    cmd = ["psql"] + conn_args + ["-t", "-A", "-c", recorded_sql]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode == 0 and result.stdout.strip() == source_version:
+        return "current"
+    return "stale"
+
+
+def record_view_version(view_name: str, source_version: str, conn_args: list) -> bool:
+    """Store the source_data_version a materialized view was just built from."""
+    if not source_version:
+        return False
+    record_sql = f"""
+        CREATE TABLE IF NOT EXISTS {VIEW_VERSIONS_TABLE} (
+            view_name TEXT PRIMARY KEY,
+            source_version TEXT NOT NULL,
+            built_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        INSERT INTO {VIEW_VERSIONS_TABLE} (view_name, source_version)
+        VALUES ('{view_name}', '{source_version}')
+        ON CONFLICT (view_name) DO UPDATE
+            SET source_version = EXCLUDED.source_version, built_at = NOW();
+    """
+    return run_psql(record_sql, conn_args, f"Record {view_name} version")
+
+
+def create_derived_views(conn_args: list, rebuild: bool = False) -> bool:
     """
     Create derived views required by the FastAPI backend.
     
@@ -882,6 +1145,11 @@ def create_derived_views(conn_args: list) -> bool:
     NOTE: power_lines_spatial is now loaded directly as a table from the
     GitHub Release (powerlines_curated layer), not created as a derived view.
     
+    Materialized views whose source tables are unchanged since the last
+    build are kept as-is unless rebuild is set (--rebuild-views). The
+    tree_nearest_line/tree_nearest_asset KNN caches behind
+    vegetation_risk_computed are reused until their sources change.
+    
     Also grants SELECT on all tables to the 'application' Postgres user,
     which is used by the SPCS service to connect to Postgres.
     """
@@ -914,14 +1182,36 @@ def create_derived_views(conn_args: list) -> bool:
         print(f"\n  Creating {view_name}...")
         sql = DERIVED_VIEWS[view_name]
         
+        source_version = ""
+        if view_name in MATERIALIZED_VIEW_SOURCES:
+            # Taken before the build: a write racing the build leaves the
+            # recorded version behind, so the next run rebuilds
+            source_version = source_data_version(view_name, conn_args)
+            state = "stale" if rebuild else materialized_view_state(view_name, source_version, conn_args)
+            if state == "current":
+                print(f"    Up to date (sources unchanged since last build), skipping")
+                print(f"    Use --rebuild-views to force a rebuild")
+                success_count += 1
+                continue
+            caches = MATERIALIZED_VIEW_CACHES.get(view_name, [])
+            if state == "stale" and caches:
+                # Sources changed in place: cached results are stale as well
+                print(f"    Dropping cached {', '.join(caches)}...")
+                drop_sql = f"DROP MATERIALIZED VIEW IF EXISTS {', '.join(caches)} CASCADE;"
+                run_psql(drop_sql, conn_args, "Drop cached views")
+        
         # For materialized views, this can take a while
         if "MATERIALIZED VIEW" in sql:
             print(f"    (This may take several minutes for spatial joins...)")
         
         if run_psql(sql, conn_args, f"Create {view_name}"):
+            if source_version:
+                record_view_version(view_name, source_version, conn_args)
             # Verify creation
             if "MATERIALIZED VIEW" in sql:
-                verify_sql = f"SELECT COUNT(*) FROM {view_name};"
+                # The build ANALYZEs the view, so pg_class already holds its
+                # row count; a COUNT(*) would re-read the whole fresh view
+                verify_sql = f"SELECT reltuples::bigint FROM pg_class WHERE oid = '{view_name}'::regclass;"
             else:
                 verify_sql = f"SELECT 1 FROM {view_name} LIMIT 1;"
             
@@ -931,7 +1221,7 @@ def create_derived_views(conn_args: list) -> bool:
             if result.returncode == 0:
                 if "MATERIALIZED VIEW" in sql:
                     count = result.stdout.strip()
-                    print(f"    SUCCESS: {view_name} created with {count} rows")
+                    print(f"    SUCCESS: {view_name} created with ~{count} rows")
                 else:
                     print(f"    SUCCESS: {view_name} created")
                 success_count += 1
@@ -995,6 +1285,10 @@ def main():
                        help="Skip creating derived views (buildings_spatial, grid_assets, vegetation_risk_computed)")
     parser.add_argument("--derived-views-only", action="store_true",
                        help="Only create derived views (skip loading raw data)")
+    parser.add_argument("--rebuild-views", action="store_true",
+                       help="Rebuild materialized views even if their source tables are unchanged")
+    parser.add_argument("--migrate-only", action="store_true",
+                       help="Only add new columns/indexes to already loaded tables (run before deploying a newer API server)")
     
     args = parser.parse_args()
     
@@ -1041,10 +1335,22 @@ def main():
         if not verify_postgis(conn_args):
             sys.exit(1)
     
+    # Handle migrate-only mode
+    if args.migrate_only:
+        if migrate_existing_tables(conn_args):
+            print("\nMigrations applied successfully!")
+            sys.exit(0)
+        else:
+            print("\nERROR: Some migrations failed")
+            sys.exit(1)
+    
     # Handle derived-views-only mode
     if args.derived_views_only:
         print("Derived-views-only mode: creating views from existing tables...")
-        if create_derived_views(conn_args):
+        if not migrate_existing_tables(conn_args):
+            print("\nERROR: Some migrations failed")
+            sys.exit(1)
+        if create_derived_views(conn_args, rebuild=args.rebuild_views):
             print("\nDerived views created successfully!")
             sys.exit(0)
         else:
@@ -1064,10 +1370,13 @@ def main():
     
     load_failed = success_count < len(args.layers)
     
+    # Bring layers that were not reloaded this run up to the current schema
+    migrations_ok = migrate_existing_tables(conn_args)
+    
     # Create derived views (unless skipped)
     derived_views_ok = True
     if not args.skip_derived_views:
-        derived_views_ok = create_derived_views(conn_args)
+        derived_views_ok = create_derived_views(conn_args, rebuild=args.rebuild_views)
     else:
         print("\nSkipping derived views (--skip-derived-views flag)")
     
@@ -1076,11 +1385,12 @@ def main():
     print("FINAL SUMMARY")
     print(f"{'='*60}")
     print(f"  Raw data layers: {success_count}/{len(args.layers)}")
+    print(f"  Migrations:      {'OK' if migrations_ok else 'FAILED'}")
     if not args.skip_derived_views:
         print(f"  Derived views:   {'OK' if derived_views_ok else 'FAILED'}")
     print(f"{'='*60}")
     
-    if load_failed or not derived_views_ok:
+    if load_failed or not migrations_ok or not derived_views_ok:
         sys.exit(1)
 
 
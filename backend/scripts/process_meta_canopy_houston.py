@@ -108,16 +108,22 @@ def generate_tree_id(lon: float, lat: float, height: float) -> str:
     return hashlib.md5(data.encode()).hexdigest()[:16]
 
 
-def estimate_canopy_radius(height_m: float) -> float:
-    """Estimate canopy radius from tree height using allometric relationship"""
+def crown_ratio(height_m):
+    """Crown-to-height ratio for a height or an array of heights"""
     # Typical crown-to-height ratio varies by species
     # Using average ratio of 0.3-0.4 for Houston area trees
-    if height_m < 5:
-        return height_m * 0.4  # Shrubs tend to be wider relative to height
-    elif height_m < 15:
-        return height_m * 0.35  # Medium trees
-    else:
-        return height_m * 0.3  # Tall trees
+    height_m = np.asarray(height_m, dtype=np.float64)
+    return np.select(
+        [height_m < 5, height_m < 15],
+        [0.4,   # Shrubs tend to be wider relative to height
+         0.35], # Medium trees
+        0.3     # Tall trees
+    )
+
+
+def estimate_canopy_radius(height_m: float) -> float:
+    """Estimate canopy radius from tree height using allometric relationship"""
+    return float(height_m * crown_ratio(height_m))
 
 
 def classify_tree(height_m: float) -> str:
@@ -152,47 +158,52 @@ def estimate_species(height_m: float, lat: float, lon: float) -> str:
         return species[h % len(species)]
 
 
-def compute_risk_score(
-    height_m: float,
-    distance_to_line_m: float,
-    line_voltage_kv: float = 12.47
-) -> Tuple[float, str]:
+def compute_risk_scores(
+    height_m: np.ndarray,
+    distance_to_line_m: np.ndarray,
+    line_voltage_kv: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Compute vegetation risk score based on tree characteristics and proximity.
+    Compute vegetation risk scores based on tree characteristics and proximity.
+    
+    Vectorized over all trees at once (one pass over contiguous arrays
+    instead of a Python call per tree).
     
     Returns:
-        (risk_score, risk_level) where risk_score is 0.0-1.0
+        (risk_score, risk_level) arrays where risk_score is 0.0-1.0
     """
+    height_m = np.asarray(height_m, dtype=np.float64)
+    distance_to_line_m = np.asarray(distance_to_line_m, dtype=np.float64)
+    
     # Get required clearance for voltage level
-    clearance_required = CLEARANCE_REQUIREMENTS.get(
-        line_voltage_kv,
-        CLEARANCE_REQUIREMENTS[12.47]  # Default to distribution
+    clearance_required = (
+        pd.Series(line_voltage_kv)
+        .map(CLEARANCE_REQUIREMENTS)
+        .fillna(CLEARANCE_REQUIREMENTS[12.47])  # Default to distribution
+        .to_numpy()
     )
     
     # Calculate clearance deficit (positive = encroachment risk)
     # Tree could fall toward line, so consider height + canopy
     fall_zone = height_m * 1.1  # 110% of height for safety factor
-    effective_distance = distance_to_line_m - estimate_canopy_radius(height_m)
+    canopy_radius = height_m * crown_ratio(height_m)
+    effective_distance = distance_to_line_m - canopy_radius
     
     # Risk components
-    proximity_risk = max(0, 1 - (effective_distance / (fall_zone + clearance_required)))
-    height_risk = min(1, height_m / 30)  # Normalize to 30m max
+    proximity_risk = np.maximum(0, 1 - (effective_distance / (fall_zone + clearance_required)))
+    height_risk = np.minimum(1, height_m / 30)  # Normalize to 30m max
     
     # Combined risk score
-    risk_score = (proximity_risk * 0.7) + (height_risk * 0.3)
-    risk_score = max(0, min(1, risk_score))
+    risk_score = np.clip((proximity_risk * 0.7) + (height_risk * 0.3), 0, 1)
     
     # Classify risk level
-    if risk_score > 0.8:
-        risk_level = "critical"
-    elif risk_score > 0.6:
-        risk_level = "warning"
-    elif risk_score > 0.35:
-        risk_level = "monitor"
-    else:
-        risk_level = "safe"
+    risk_level = np.select(
+        [risk_score > 0.8, risk_score > 0.6, risk_score > 0.35],
+        ["critical", "warning", "monitor"],
+        "safe"
+    )
     
-    return round(risk_score, 3), risk_level
+    return np.round(risk_score, 3), risk_level
 
 
 def generate_synthetic_houston_trees(
@@ -223,6 +234,7 @@ def generate_synthetic_houston_trees(
     ]
     
     trees = []
+    line_distances = []  # Unrounded, for risk scoring after the loop
     
     for i in range(num_trees):
         # Select urban center based on weights
@@ -262,6 +274,7 @@ def generate_synthetic_houston_trees(
         # In urban areas, trees are often near lines
         distance_to_line = np.random.exponential(15) + 2  # Minimum 2m
         distance_to_line = min(100, distance_to_line)  # Cap at 100m
+        line_distances.append(distance_to_line)
         
         # Line voltage (distribution lines most common)
         voltage = np.random.choice(
@@ -269,9 +282,6 @@ def generate_synthetic_houston_trees(
             p=[0.70, 0.15, 0.10, 0.05]
         )
         
-        # Compute risk
-        risk_score, risk_level = compute_risk_score(height, distance_to_line, voltage)
-        
         tree_id = generate_tree_id(lon, lat, height)
         species = estimate_species(height, lat, lon)
         tree_class = classify_tree(height)
@@ -296,8 +306,8 @@ def generate_synthetic_houston_trees(
             "canopy_radius_m": canopy_radius,
             "species": species,
             "tree_class": tree_class,
-            "risk_score": risk_score,
-            "risk_level": risk_level,
+            "risk_score": None,  # Scored for all trees at once below
+            "risk_level": None,
             "distance_to_line_m": round(distance_to_line, 1),
             "nearest_line_id": f"LINE-{hash(f'{lon:.3f},{lat:.3f}') % 10000:04d}",
             "nearest_line_voltage_kv": voltage,
@@ -314,6 +324,13 @@ def generate_synthetic_houston_trees(
     
     df = pd.DataFrame(trees)
     
+    # Compute risk
+    df["risk_score"], df["risk_level"] = compute_risk_scores(
+        df["height_m"].to_numpy(),
+        np.array(line_distances),
+        df["nearest_line_voltage_kv"].to_numpy()
+    )
+    
     # Print statistics
     print(f"\n📊 Tree Statistics:")
     print(f"   Total trees: {len(df):,}")
@@ -161,12 +161,18 @@ def setup_vegetation_cache(conn):
                 clearance_deficit_m DOUBLE PRECISION,
                 years_to_encroachment DOUBLE PRECISION,
                 data_source VARCHAR(100),
-                geom GEOMETRY(Point, 4326)
+                geom GEOMETRY(Point, 4326),
+                -- UTM zone 15N (meters) copy of geom for planar distance/KNN math
+                geom_m GEOMETRY(Point, 32615)
+                    GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED
             );
             
-            -- Spatial index for vegetation proximity queries
-            CREATE INDEX IF NOT EXISTS idx_vegetation_geom 
-                ON vegetation_risk USING GIST (geom);
+            -- Spatial index for vegetation proximity queries (bbox predicates
+            -- only, where SP-GiST suits point data better than GiST)
+            CREATE INDEX IF NOT EXISTS idx_vegetation_geom_spgist 
+                ON vegetation_risk USING SPGIST (geom);
+            CREATE INDEX IF NOT EXISTS idx_vegetation_geom_m 
+                ON vegetation_risk USING GIST (geom_m);
             
             -- Risk-based queries
             CREATE INDEX IF NOT EXISTS idx_vegetation_risk 
@@ -238,12 +244,17 @@ def setup_power_lines(conn):
                 geom GEOMETRY(LineString, 4326),
                 centroid_lat DOUBLE PRECISION,
                 centroid_lon DOUBLE PRECISION,
-                created_at TIMESTAMP DEFAULT NOW()
+                created_at TIMESTAMP DEFAULT NOW(),
+                -- UTM zone 15N (meters) copy of geom for planar distance/KNN math
+                geom_m GEOMETRY(LineString, 32615)
+                    GENERATED ALWAYS AS (ST_Transform(geom, 32615)) STORED
             );
             
             -- Spatial index for power line queries
             CREATE INDEX IF NOT EXISTS idx_grid_power_lines_geom 
                 ON grid_power_lines USING GIST (geom);
+            CREATE INDEX IF NOT EXISTS idx_grid_power_lines_geom_m 
+                ON grid_power_lines USING GIST (geom_m);
             
             -- Lookup indexes
             CREATE INDEX IF NOT EXISTS idx_grid_power_lines_circuit 
@@ -8,8 +8,12 @@ Snowflake Managed Postgres for PostGIS spatial query acceleration.
 
 ARCHITECTURE:
 - Reads data from Snowflake using snowflake-connector-python
-- Writes to Postgres using psycopg2 with batch inserts
-- Uses atomic swap pattern (temp table -> truncate -> insert) for consistency
+- Writes to Postgres using psycopg2 COPY ... FROM STDIN (CSV)
+- Spools each Snowflake result to a local temp file first, then truncates and
+  reloads the table in one short transaction for consistency (COPY FREEZE
+  into the truncated table, so no dead tuples or VACUUM debt). The TRUNCATE
+  lock is never held while data is still arriving from Snowflake.
+- Reuses one Snowflake and one Postgres connection for every table synced
 
 PREREQUISITES:
 1. Run setup_postgres_schema.py first to create tables
@@ -51,25 +55,56 @@ See docs/POSTGRES_SYNC_RELIABILITY.md for the scheduled sync architecture.
 import os
 import sys
 import argparse
+import csv
+import tempfile
 import time
 from typing import Optional, List, Dict, Any
 
 import snowflake.connector
 import psycopg2
-from psycopg2.extras import execute_batch
+
+
+# Process-wide Snowflake connection, reused across syncs while it stays healthy
+_sf_conn = None
+
+
+def _is_connection_alive(conn) -> bool:
+    """Cheap health check: the connection is open and answers SELECT 1."""
+    if conn is None or conn.is_closed():
+        return False
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1", timeout=2)
+        finally:
+            cursor.close()
+        return True
+    except Exception:
+        return False
 
 
 def get_snowflake_connection():
-    """Get Snowflake connection using environment variables or SSO."""
-    return snowflake.connector.connect(
-        account=os.environ.get("SNOWFLAKE_ACCOUNT"),
-        user=os.environ.get("SNOWFLAKE_USER"),
-        password=os.environ.get("SNOWFLAKE_PASSWORD"),
-        authenticator=os.environ.get("SNOWFLAKE_AUTHENTICATOR", "snowflake"),
-        database=os.environ.get("SNOWFLAKE_DATABASE", "FLUX_DB"),
-        schema=os.environ.get("SNOWFLAKE_SCHEMA", "PRODUCTION"),
-        warehouse=os.environ.get("SNOWFLAKE_WAREHOUSE", "FLUX_WH"),
-    )
+    """
+    Get Snowflake connection using environment variables or SSO.
+    
+    The connection is cached at module level and reused by later calls in the
+    same process (e.g. a scheduler invoking the sync functions repeatedly), so
+    the TLS/auth handshake is paid once. A dead or closed connection is
+    replaced transparently.
+    """
+    global _sf_conn
+    if not _is_connection_alive(_sf_conn):
+        _sf_conn = snowflake.connector.connect(
+            account=os.environ.get("SNOWFLAKE_ACCOUNT"),
+            user=os.environ.get("SNOWFLAKE_USER"),
+            password=os.environ.get("SNOWFLAKE_PASSWORD"),
+            authenticator=os.environ.get("SNOWFLAKE_AUTHENTICATOR", "snowflake"),
+            database=os.environ.get("SNOWFLAKE_DATABASE", "FLUX_DB"),
+            schema=os.environ.get("SNOWFLAKE_SCHEMA", "PRODUCTION"),
+            warehouse=os.environ.get("SNOWFLAKE_WAREHOUSE", "FLUX_WH"),
+            client_session_keep_alive=True,
+        )
+    return _sf_conn
 
 
 def get_postgres_connection():
@@ -94,7 +129,80 @@ def get_postgres_connection():
     )
 
 
-def sync_topology(sf_conn, pg_conn, batch_size: int = 5000):
+# Spooled results stay in memory up to this size, then roll over to disk
+SPOOL_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+
+# Explicit NULL marker for the CSV spool. COPY's CSV default treats any empty
+# unquoted field as NULL, which would also turn empty strings into NULLs.
+CSV_NULL_MARKER = r"\N"
+
+
+def copy_csv(pg_cursor, table: str, columns: List[str], csv_file, freeze: bool = False) -> None:
+    """
+    COPY an already CSV-encoded file object into a Postgres table.
+    
+    With freeze=True rows are written already frozen (COPY ... FREEZE), so the
+    reload leaves no VACUUM work behind. Postgres only allows this when the
+    table was created or truncated earlier in the same transaction.
+    """
+    options = f"FORMAT csv, NULL '{CSV_NULL_MARKER}'"
+    if freeze:
+        options += ", FREEZE"
+    pg_cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH ({options})",
+        csv_file
+    )
+
+
+def spool_from_snowflake(sf_cursor, batch_size: int):
+    """
+    Drain an executed Snowflake query into a local CSV spool file.
+    
+    Rows are pulled with fetchmany() and encoded batch by batch by the
+    C-implemented csv module, so the full result set is never held as Python
+    objects; the spool itself moves to disk once it outgrows
+    SPOOL_MAX_MEMORY_BYTES. None values are written as CSV_NULL_MARKER (\\N),
+    which copy_csv declares as COPY's NULL string, so empty strings stay
+    empty strings as they did with row-by-row inserts. (A source value that
+    is literally the two characters \\N would also load as NULL; none of the
+    synced columns carry such values.) Geometry columns arrive as EWKT text
+    (e.g. "SRID=4326;POINT(lon lat)"), which PostGIS parses on input.
+    
+    Returns:
+        (spool file rewound to the start, number of rows spooled)
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY_BYTES, mode='w+', newline='')
+    writer = csv.writer(spool)
+    row_count = 0
+    while True:
+        rows = sf_cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        writer.writerows(
+            [CSV_NULL_MARKER if value is None else value for value in row]
+            for row in rows
+        )
+        row_count += len(rows)
+    spool.seek(0)
+    return spool, row_count
+
+
+def reload_table(pg_conn, table: str, columns: List[str], spool) -> None:
+    """
+    Replace a table's contents with a spooled CSV result.
+    
+    TRUNCATE and the COPY commit together, so readers never see an empty or
+    partially loaded table. The data is already local, so TRUNCATE's ACCESS
+    EXCLUSIVE lock only lasts as long as the Postgres-side COPY, not the
+    Snowflake transfer. TRUNCATE swaps in fresh storage, so the load can be
+    COPY FREEZE'd.
+    """
+    with pg_conn, pg_conn.cursor() as pg_cursor:
+        pg_cursor.execute(f"TRUNCATE TABLE {table};")
+        copy_csv(pg_cursor, table, columns, spool, freeze=True)
+
+
+def sync_topology(sf_conn, pg_conn, batch_size: int = 50000):
     """
     Sync topology connections from Snowflake to Postgres.
     
@@ -106,6 +214,7 @@ def sync_topology(sf_conn, pg_conn, batch_size: int = 5000):
     
     # Read from Snowflake
     sf_cursor = sf_conn.cursor()
+    # Column order matches the COPY column list below
     sf_cursor.execute("""
         SELECT 
             ASSET_ID,
@@ -115,48 +224,30 @@ def sync_topology(sf_conn, pg_conn, batch_size: int = 5000):
             FEEDER_ID,
             LATITUDE,
             LONGITUDE,
+            ST_ASEWKT(ST_MAKEPOINT(LONGITUDE, LATITUDE)) AS GEOM,
             STATUS,
             VOLTAGE_KV
         FROM FLUX_OPS_CENTER_TOPOLOGY
         WHERE LATITUDE IS NOT NULL AND LONGITUDE IS NOT NULL
     """)
     
-    rows = sf_cursor.fetchall()
-    row_count = len(rows)
-    print(f"  Read {row_count:,} rows from Snowflake")
-    
-    # Write to Postgres with atomic swap
-    pg_cursor = pg_conn.cursor()
-    pg_conn.autocommit = True
-    
-    # Truncate and insert
-    pg_cursor.execute("TRUNCATE TABLE topology_connections_cache;")
-    
-    insert_sql = """
-        INSERT INTO topology_connections_cache 
-        (asset_id, asset_type, substation_id, circuit_id, feeder_id, 
-         latitude, longitude, geom, status, voltage_kv)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, ST_SetSRID(ST_MakePoint(%s, %s), 4326), %s, %s)
-    """
-    
-    # Convert rows for batch insert
-    insert_rows = [
-        (row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[6], row[5], row[7], row[8])
-        for row in rows
-    ]
-    
-    execute_batch(pg_cursor, insert_sql, insert_rows, page_size=batch_size)
+    # Fetch everything from Snowflake before touching the Postgres table
+    spool, row_count = spool_from_snowflake(sf_cursor, batch_size)
+    with spool:
+        reload_table(pg_conn, "topology_connections_cache", [
+            "asset_id", "asset_type", "substation_id", "circuit_id", "feeder_id",
+            "latitude", "longitude", "geom", "status", "voltage_kv"
+        ], spool)
     
     elapsed = time.time() - start_time
     print(f"  Synced {row_count:,} rows in {elapsed:.1f}s")
     
     sf_cursor.close()
-    pg_cursor.close()
     
     return row_count
 
 
-def sync_vegetation(sf_conn, pg_conn, batch_size: int = 5000):
+def sync_vegetation(sf_conn, pg_conn, batch_size: int = 50000):
     """
     Sync vegetation risk data from Snowflake to Postgres.
     
@@ -167,11 +258,13 @@ def sync_vegetation(sf_conn, pg_conn, batch_size: int = 5000):
     start_time = time.time()
     
     sf_cursor = sf_conn.cursor()
+    # Column order matches the COPY column list below
     sf_cursor.execute("""
         SELECT 
             TREE_ID,
             LATITUDE,
             LONGITUDE,
+            ST_ASEWKT(ST_MAKEPOINT(LONGITUDE, LATITUDE)) AS GEOM,
             HEIGHT_M,
             CANOPY_RADIUS_M,
             SPECIES,
@@ -186,41 +279,24 @@ def sync_vegetation(sf_conn, pg_conn, batch_size: int = 5000):
         LIMIT 500000
     """)
     
-    rows = sf_cursor.fetchall()
-    row_count = len(rows)
-    print(f"  Read {row_count:,} rows from Snowflake")
-    
-    pg_cursor = pg_conn.cursor()
-    pg_conn.autocommit = True
-    
-    pg_cursor.execute("TRUNCATE TABLE vegetation_risk_cache;")
-    
-    insert_sql = """
-        INSERT INTO vegetation_risk_cache 
-        (tree_id, latitude, longitude, geom, height_m, canopy_radius_m, species,
-         health_score, risk_score, fall_zone_m, nearest_line_id, 
-         nearest_line_distance_m, encroachment_category)
-        VALUES (%s, %s, %s, ST_SetSRID(ST_MakePoint(%s, %s), 4326), %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-    
-    insert_rows = [
-        (row[0], row[1], row[2], row[2], row[1], row[3], row[4], row[5], 
-         row[6], row[7], row[8], row[9], row[10], row[11])
-        for row in rows
-    ]
-    
-    execute_batch(pg_cursor, insert_sql, insert_rows, page_size=batch_size)
+    # Fetch everything from Snowflake before touching the Postgres table
+    spool, row_count = spool_from_snowflake(sf_cursor, batch_size)
+    with spool:
+        reload_table(pg_conn, "vegetation_risk_cache", [
+            "tree_id", "latitude", "longitude", "geom", "height_m", "canopy_radius_m",
+            "species", "health_score", "risk_score", "fall_zone_m", "nearest_line_id",
+            "nearest_line_distance_m", "encroachment_category"
+        ], spool)
     
     elapsed = time.time() - start_time
     print(f"  Synced {row_count:,} rows in {elapsed:.1f}s")
     
     sf_cursor.close()
-    pg_cursor.close()
     
     return row_count
 
 
-def sync_transformers(sf_conn, pg_conn, batch_size: int = 5000):
+def sync_transformers(sf_conn, pg_conn, batch_size: int = 50000):
     """
     Sync transformer metadata from Snowflake to Postgres.
     
@@ -231,6 +307,7 @@ def sync_transformers(sf_conn, pg_conn, batch_size: int = 5000):
     start_time = time.time()
     
     sf_cursor = sf_conn.cursor()
+    # Column order matches the COPY column list below
     sf_cursor.execute("""
         SELECT 
             TRANSFORMER_ID,
@@ -238,6 +315,7 @@ def sync_transformers(sf_conn, pg_conn, batch_size: int = 5000):
             CIRCUIT_ID,
             LATITUDE,
             LONGITUDE,
+            ST_ASEWKT(ST_MAKEPOINT(LONGITUDE, LATITUDE)) AS GEOM,
             RATED_KVA,
             TRANSFORMER_AGE_YEARS,
             MANUFACTURER,
@@ -248,35 +326,19 @@ def sync_transformers(sf_conn, pg_conn, batch_size: int = 5000):
         WHERE LATITUDE IS NOT NULL AND LONGITUDE IS NOT NULL
     """)
     
-    rows = sf_cursor.fetchall()
-    row_count = len(rows)
-    print(f"  Read {row_count:,} rows from Snowflake")
-    
-    pg_cursor = pg_conn.cursor()
-    pg_conn.autocommit = True
-    
-    pg_cursor.execute("TRUNCATE TABLE transformers_spatial;")
-    
-    insert_sql = """
-        INSERT INTO transformers_spatial 
-        (transformer_id, substation_id, circuit_id, latitude, longitude, geom,
-         rated_kva, age_years, manufacturer, installation_date, last_maintenance, status)
-        VALUES (%s, %s, %s, %s, %s, ST_SetSRID(ST_MakePoint(%s, %s), 4326), %s, %s, %s, %s, %s, %s)
-    """
-    
-    insert_rows = [
-        (row[0], row[1], row[2], row[3], row[4], row[4], row[3], 
-         row[5], row[6], row[7], row[8], row[9], row[10])
-        for row in rows
-    ]
-    
-    execute_batch(pg_cursor, insert_sql, insert_rows, page_size=batch_size)
+    # Fetch everything from Snowflake before touching the Postgres table
+    spool, row_count = spool_from_snowflake(sf_cursor, batch_size)
+    with spool:
+        reload_table(pg_conn, "transformers_spatial", [
+            "transformer_id", "substation_id", "circuit_id", "latitude", "longitude",
+            "geom", "rated_kva", "age_years", "manufacturer", "installation_date",
+            "last_maintenance", "status"
+        ], spool)
     
     elapsed = time.time() - start_time
     print(f"  Synced {row_count:,} rows in {elapsed:.1f}s")
     
     sf_cursor.close()
-    pg_cursor.close()
     
     return row_count
 
@@ -305,8 +367,8 @@ def main():
     parser = argparse.ArgumentParser(description="Sync Snowflake data to Postgres")
     parser.add_argument("--table", choices=["topology", "vegetation", "transformers", "all"],
                         default="all", help="Table to sync")
-    parser.add_argument("--batch-size", type=int, default=5000,
-                        help="Batch size for inserts")
+    parser.add_argument("--batch-size", type=int, default=50000,
+                        help="Rows fetched from Snowflake per COPY batch")
     args = parser.parse_args()
     
     print("=" * 60)
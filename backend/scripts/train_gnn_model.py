@@ -290,11 +290,16 @@ class GNNTrainer:
         print(f"\nUsing top {len(high_crit_idx)} nodes as cascade seeds")
         
         # Aggregate cascade labels
-        cascade_labels = np.zeros(len(self.nodes_df))
+        num_nodes = len(self.nodes_df)
+        cascade_labels = np.zeros(num_nodes)
+        
+        # visited_by[j] == s marks node j as visited in the BFS from seed s,
+        # so one flat list serves every seed without being cleared
+        visited_by = [-1] * num_nodes
         
-        for seed_idx in high_crit_idx:
+        for s, seed_idx in enumerate(high_crit_idx):
             # BFS cascade simulation
-            visited = {seed_idx}
+            visited_by[seed_idx] = s
             queue = deque([(seed_idx, 0)])
             
             while queue:
@@ -306,8 +311,8 @@ class GNNTrainer:
                 cascade_labels[current] = 1  # Mark as affected
                 
                 for neighbor in adjacency.get(current, []):
-                    if neighbor not in visited:
-                        visited.add(neighbor)
+                    if visited_by[neighbor] != s:
+                        visited_by[neighbor] = s
                         queue.append((neighbor, depth + 1))
         
         self.y = torch.tensor(cascade_labels, dtype=torch.float32)
@@ -498,12 +503,22 @@ class GNNTrainer:
         
         predictions_df = self.get_predictions()
         
+        # Bulk load: write_pandas stages Parquet chunks with a parallel PUT and
+        # loads them with a single COPY INTO, replacing the table contents
         session = self.create_session()
-        snowpark_df = session.create_dataframe(predictions_df)
-        table_path = f"{DB}.{SCHEMA_CASCADE_ANALYSIS}.GNN_PREDICTIONS"
-        snowpark_df.write.mode("overwrite").save_as_table(table_path)
+        session.write_pandas(
+            predictions_df,
+            "GNN_PREDICTIONS",
+            database=DB,
+            schema=SCHEMA_CASCADE_ANALYSIS,
+            compression="snappy",
+            parallel=8,
+            auto_create_table=True,
+            overwrite=True,
+            use_logical_type=True,
+        )
         
-        print(f"  Written to {table_path}")
+        print(f"  Written to {DB}.{SCHEMA_CASCADE_ANALYSIS}.GNN_PREDICTIONS")
     
     def register_model(self) -> None:
         """Register model in Snowflake Model Registry."""
@@ -18,7 +18,7 @@ from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from functools import lru_cache
 from dataclasses import dataclass, field
-from collections import deque
+from collections import Counter, deque
 from enum import Enum
 import asyncpg
 import asyncio
@@ -453,7 +453,11 @@ async def lifespan(app: FastAPI):
                 password=settings.vite_postgres_password,
                 ssl='require',
                 min_size=1,
-                max_size=20
+                max_size=20,
+                # asyncpg already prepares and caches each query per
+                # connection; JIT would add compile time to every
+                # high-cost spatial plan on this latency-bound path
+                server_settings={'jit': 'off'}
             )
             logger.info(f"Postgres async pool initialized: {settings.vite_postgres_host}")
         else:
@@ -787,10 +791,20 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     )
 
 
+# SPCS rotates the OAuth token file; cache its contents keyed by mtime so new
+# connections skip the open/read unless the token has actually changed
+_login_token_cache: Dict[str, Any] = {"mtime": None, "value": None}
+
+
 def get_login_token() -> Optional[str]:
+    token_path = '/snowflake/session/token'
     try:
-        with open('/snowflake/session/token', 'r') as f:
-            return f.read()
+        mtime = os.stat(token_path).st_mtime
+        if mtime != _login_token_cache["mtime"]:
+            with open(token_path, 'r') as f:
+                _login_token_cache["value"] = f.read()
+            _login_token_cache["mtime"] = mtime
+        return _login_token_cache["value"]
     except FileNotFoundError:
         return None
 
@@ -1359,14 +1373,15 @@ async def get_assets_from_snowflake(
                     m.CUSTOMER_SEGMENT_ID,
                     m.COMMISSIONED_DATE,
                     m.CIRCUIT_ID,
-                    COALESCE(u.avg_usage_kwh, UNIFORM(5, 50, RANDOM())) as usage,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY ROUND(m.METER_LATITUDE / 0.005), ROUND(m.METER_LONGITUDE / 0.005)
-                        ORDER BY COALESCE(u.avg_usage_kwh, UNIFORM(5, 50, RANDOM())) DESC
-                    ) as rn
+                    COALESCE(u.avg_usage_kwh, UNIFORM(5, 50, RANDOM())) as usage
                 FROM {DB}.PRODUCTION.METER_INFRASTRUCTURE m
                 LEFT JOIN recent_meter_usage u ON m.METER_ID = u.METER_ID
                 WHERE m.METER_LATITUDE IS NOT NULL AND m.METER_LONGITUDE IS NOT NULL
+                -- Top 30 meters by usage per ~500m grid cell, filtered in the same window pass
+                QUALIFY ROW_NUMBER() OVER (
+                    PARTITION BY ROUND(m.METER_LATITUDE / 0.005), ROUND(m.METER_LONGITUDE / 0.005)
+                    ORDER BY usage DESC
+                ) <= 30
             )
             SELECT 
                 ASSET_ID, ASSET_NAME, ASSET_TYPE, LATITUDE, LONGITUDE,
@@ -1426,7 +1441,7 @@ async def get_assets_from_snowflake(
                     NULL as POLE_HEIGHT_FT,
                     CUSTOMER_SEGMENT_ID as CUSTOMER_SEGMENT, CIRCUIT_ID
                 FROM sampled_meters
-                WHERE rn <= 30
+                WHERE METER_LATITUDE IS NOT NULL AND METER_LONGITUDE IS NOT NULL
                     {combined_where}
             )
             {limit_clause}
@@ -2967,27 +2982,33 @@ async def get_nearest_power_line(
     
     try:
         async with postgres_pool.acquire() as conn:
-            # Find the single nearest power line within max_distance_m
+            # Find the single nearest power line within max_distance_m.
+            # The KNN <-> operator walks the GiST index on geom_m (UTM 15N meters),
+            # so distances are planar and only the winning line is measured.
             row = await conn.fetchrow("""
                 SELECT 
                     power_line_id,
                     class,
                     length_meters,
-                    ST_Distance(
-                        geom::geography,
-                        ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography
-                    ) as distance_meters,
+                    distance_meters,
                     -- Get the closest point on the line for visualization
                     ST_X(ST_ClosestPoint(geom, ST_SetSRID(ST_MakePoint($1, $2), 4326))) as closest_lon,
                     ST_Y(ST_ClosestPoint(geom, ST_SetSRID(ST_MakePoint($1, $2), 4326))) as closest_lat
-                FROM power_lines_spatial
-                WHERE ST_DWithin(
-                    geom::geography,
-                    ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography,
-                    $3
-                )
-                ORDER BY distance_meters
-                LIMIT 1
+                FROM (
+                    SELECT 
+                        power_line_id,
+                        class,
+                        length_meters,
+                        geom,
+                        ST_Distance(
+                            geom_m,
+                            ST_Transform(ST_SetSRID(ST_MakePoint($1, $2), 4326), 32615)
+                        ) as distance_meters
+                    FROM power_lines_spatial
+                    ORDER BY geom_m <-> ST_Transform(ST_SetSRID(ST_MakePoint($1, $2), 4326), 32615)
+                    LIMIT 1
+                ) nearest
+                WHERE distance_meters <= $3
             """, lon, lat, max_distance_m)
             
             query_time = (time.time() - start) * 1000
@@ -3049,41 +3070,42 @@ async def compute_vegetation_risk(
     
     try:
         async with postgres_pool.acquire() as conn:
-            # 1. Find nearest power line within 500m
+            # 1. Find nearest power line within 500m (single index-backed KNN
+            #    probe on the projected UTM 15N column - planar meters)
             power_line = await conn.fetchrow("""
-                SELECT 
-                    power_line_id,
-                    class,
-                    ST_Distance(
-                        geom::geography,
-                        ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography
-                    ) as distance_m
-                FROM power_lines_spatial
-                WHERE ST_DWithin(
-                    geom::geography,
-                    ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography,
-                    500
-                )
-                ORDER BY distance_m
-                LIMIT 1
+                SELECT power_line_id, class, distance_m
+                FROM (
+                    SELECT 
+                        power_line_id,
+                        class,
+                        ST_Distance(
+                            geom_m,
+                            ST_Transform(ST_SetSRID(ST_MakePoint($1, $2), 4326), 32615)
+                        ) as distance_m
+                    FROM power_lines_spatial
+                    ORDER BY geom_m <-> ST_Transform(ST_SetSRID(ST_MakePoint($1, $2), 4326), 32615)
+                    LIMIT 1
+                ) nearest
+                WHERE distance_m <= 500
             """, lon, lat)
             
-            # 2. Find nearest grid assets within fall zone + buffer
+            # 2. Find nearest grid assets within fall zone + buffer. The stored
+            #    geom bbox check (radius in degrees of longitude, the wider
+            #    axis) hits the GiST index; the radius test uses sphere math
+            #    (sub-meter error at these ranges), the reported distance
+            #    stays on the spheroid.
             search_radius = max(fall_zone * 1.5, 100)  # At least 100m search
             nearest_assets = await conn.fetch("""
-                SELECT 
-                    asset_id,
-                    asset_type,
-                    ST_Distance(
-                        ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography,
-                        ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography
-                    ) as distance_m
-                FROM grid_assets
-                WHERE ST_DWithin(
-                    ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography,
-                    ST_SetSRID(ST_MakePoint($1, $2), 4326)::geography,
-                    $3
+                WITH pt AS (
+                    SELECT ST_SetSRID(ST_MakePoint($1, $2), 4326) AS geom
                 )
+                SELECT 
+                    ga.asset_id,
+                    ga.asset_type,
+                    ST_Distance(ga.geom::geography, pt.geom::geography) as distance_m
+                FROM grid_assets ga, pt
+                WHERE ga.geom && ST_Expand(pt.geom, $3 / (111320 * COS(RADIANS($2))))
+                AND ST_DWithin(ga.geom::geography, pt.geom::geography, $3, false)
                 ORDER BY distance_m
                 LIMIT 5
             """, lon, lat, search_radius)
@@ -3209,7 +3231,9 @@ async def get_vegetation_near_power_lines(
                     MIN(ST_Distance(v.geom::geography, p.geom::geography)) as min_distance_to_line
                 FROM vegetation_risk v
                 JOIN power_lines_spatial p 
-                    ON ST_DWithin(v.geom::geography, p.geom::geography, $1)
+                    -- Sphere (not spheroid) math for the high-volume join
+                    -- predicate; the reported distance stays exact
+                    ON ST_DWithin(v.geom::geography, p.geom::geography, $1, false)
                 GROUP BY v.tree_id, v.class, v.subtype, v.longitude, v.latitude
                 ORDER BY min_distance_to_line
                 LIMIT $2
@@ -3439,7 +3463,7 @@ async def get_vegetation_risk_clusters(
 
 @app.get("/api/spatial/power-line-buffer-analysis", tags=["Geospatial"])
 async def get_power_line_buffer_analysis(
-    buffer_meters: float = Query(15, description="Buffer distance in meters"),
+    buffer_meters: float = Query(15, gt=0, le=200, description="Buffer distance in meters (max 200)"),
     line_class: Optional[str] = Query(None, description="Filter by line class (transmission, distribution)")
 ):
     """
@@ -3450,6 +3474,10 @@ async def get_power_line_buffer_analysis(
     - Right-of-way compliance
     - Wildfire risk assessment
     - Vegetation management planning
+    
+    buffer_meters is capped at 200 m: vegetation_risk_computed only records
+    a tree's nearest line when it lies within GREATEST(200, 2 x height) of
+    the tree, so a wider buffer would silently miss encroachments.
     """
     if not postgres_pool:
         raise HTTPException(status_code=503, detail="Postgres not configured for spatial queries")
@@ -3739,15 +3767,11 @@ async def get_power_line_connected_assets(
                     ga.load_percent,
                     ga.circuit_id,
                     ST_Distance(
-                        ST_Transform(ST_SetSRID(ST_MakePoint(ga.longitude, ga.latitude), 4326), 3857),
+                        ST_Transform(ga.geom, 3857),
                         ST_Transform(line.geom, 3857)
                     ) as distance_m
                 FROM grid_assets_cache ga, line
-                WHERE ST_DWithin(
-                    ST_SetSRID(ST_MakePoint(ga.longitude, ga.latitude), 4326),
-                    line.geom,
-                    $2
-                )
+                WHERE ST_DWithin(ga.geom, line.geom, $2)
                 AND ga.asset_type IN ('transformer', 'pole')
                 ORDER BY distance_m ASC
                 LIMIT 50
@@ -3806,11 +3830,9 @@ async def get_vegetation_layer(
     try:
         cached = await spatial_cache.get_vegetation(min_lon, max_lon, min_lat, max_lat, limit)
         if cached is not None:
+            level_counts = Counter(f.get("risk_level") for f in cached)
             risk_summary = {
-                "critical": sum(1 for f in cached if f.get("risk_level") == "critical"),
-                "warning": sum(1 for f in cached if f.get("risk_level") == "warning"),
-                "monitor": sum(1 for f in cached if f.get("risk_level") == "monitor"),
-                "safe": sum(1 for f in cached if f.get("risk_level") == "safe")
+                level: level_counts[level] for level in ("critical", "warning", "monitor", "safe")
             }
             return {
                 "type": "vegetation",
@@ -3878,11 +3900,9 @@ async def get_vegetation_layer(
                        if min_lon <= f["position"][0] <= max_lon 
                        and min_lat <= f["position"][1] <= max_lat][:limit]
             
+            level_counts = Counter(f["risk_level"] for f in features)
             risk_summary = {
-                "critical": sum(1 for f in features if f["risk_level"] == "critical"),
-                "warning": sum(1 for f in features if f["risk_level"] == "warning"),
-                "monitor": sum(1 for f in features if f["risk_level"] == "monitor"),
-                "safe": sum(1 for f in features if f["risk_level"] == "safe")
+                level: level_counts[level] for level in ("critical", "warning", "monitor", "safe")
             }
             
             return {
@@ -5161,9 +5181,10 @@ async def get_transformer_risk_predictions(
         predictions = await run_snowflake_query(_fetch_predictions, timeout=60)
         query_time = round((time.time() - start) * 1000, 2)
         
-        # Calculate summary stats
-        critical_count = sum(1 for p in predictions if p['risk_level'] == 'critical')
-        warning_count = sum(1 for p in predictions if p['risk_level'] == 'warning')
+        # Calculate summary stats (single pass over predictions)
+        level_counts = Counter(p['risk_level'] for p in predictions)
+        critical_count = level_counts['critical']
+        warning_count = level_counts['warning']
         
         return {
             "predictions": predictions,
@@ -5318,9 +5339,10 @@ async def predict_transformer_failures_with_ml_model(
         
         query_time = round((time.time() - start) * 1000, 2)
         
-        # Summary statistics
-        critical = sum(1 for p in predictions if p['risk_level'] == 'critical')
-        warning = sum(1 for p in predictions if p['risk_level'] == 'warning')
+        # Summary statistics (single pass over predictions)
+        level_counts = Counter(p['risk_level'] for p in predictions)
+        critical = level_counts['critical']
+        warning = level_counts['warning']
         
         return {
             "predictions": predictions,
@@ -5415,11 +5437,12 @@ async def predict_transformer_risk_heuristic(county, min_load_pct, limit):
         conn.close()
         return results
     predictions = await run_snowflake_query(_fetch_heuristic, timeout=60)
+    level_counts = Counter(p['risk_level'] for p in predictions)
     return {
         "predictions": predictions, "count": len(predictions),
-        "summary": {"critical": sum(1 for p in predictions if p['risk_level'] == 'critical'),
-                   "warning": sum(1 for p in predictions if p['risk_level'] == 'warning'),
-                   "elevated": len(predictions) - sum(1 for p in predictions if p['risk_level'] in ['critical', 'warning'])},
+        "summary": {"critical": level_counts['critical'],
+                   "warning": level_counts['warning'],
+                   "elevated": len(predictions) - level_counts['critical'] - level_counts['warning']},
         "model_info": {"name": "HEURISTIC_FALLBACK", "note": "ML model unavailable, using rule-based scoring"}
     }
 
@@ -5780,16 +5803,25 @@ async def simulate_cascade_realtime(
                 FROM {DB}.ML_DEMO.GRID_EDGES
             """)
             
+            edges = [
+                (row[0], row[1], float(row[2]))
+                for row in cursor.fetchall()
+                if row[0] in nodes and row[1] in nodes
+            ]
+            
+            # Distance factor (exponential decay, 5km characteristic distance)
+            # for every edge in one vectorized exp instead of a math.exp per
+            # edge visit inside the BFS
+            distance_factors = np.exp(-np.array([e[2] for e in edges], dtype=np.float64) / 5.0).tolist()
+            
             adjacency = {}
-            for row in cursor.fetchall():
-                from_node, to_node, distance = row[0], row[1], float(row[2])
-                if from_node in nodes and to_node in nodes:
-                    if from_node not in adjacency:
-                        adjacency[from_node] = []
-                    if to_node not in adjacency:
-                        adjacency[to_node] = []
-                    adjacency[from_node].append((to_node, distance))
-                    adjacency[to_node].append((from_node, distance))
+            for (from_node, to_node, distance), distance_factor in zip(edges, distance_factors):
+                if from_node not in adjacency:
+                    adjacency[from_node] = []
+                if to_node not in adjacency:
+                    adjacency[to_node] = []
+                adjacency[from_node].append((to_node, distance, distance_factor))
+                adjacency[to_node].append((from_node, distance, distance_factor))
             
             cursor.close()
             conn.close()
@@ -5798,34 +5830,27 @@ async def simulate_cascade_realtime(
             if patient_zero_id not in nodes:
                 return {"error": f"Patient Zero {patient_zero_id} not found"}
             
-            import math
             from collections import deque
             
-            # Initialize Patient Zero
-            p0 = nodes[patient_zero_id]
-            patient_zero = {
-                **p0,
-                'order': 0,
-                'wave_depth': 0,
-                'triggered_by': None,
-                'failure_probability': 1.0
-            }
+            if temperature_c < 0:
+                temp_stress = 1.0 + abs(temperature_c) / 20.0
+            elif temperature_c > 35:
+                temp_stress = 1.0 + (temperature_c - 35) / 15.0
+            else:
+                temp_stress = 1.0
             
-            # BFS cascade simulation
+            # BFS cascade simulation. The loop only records which nodes failed,
+            # in which wave, from which trigger, in flat parallel lists; the
+            # response dicts are built in one pass once the BFS is done
             queue = deque([(patient_zero_id, 0)])
             visited = {patient_zero_id}
-            cascade_order = [patient_zero]
-            propagation_paths = []
-            wave_stats = {0: {
-                'wave_number': 0,
-                'nodes_failed': 1,
-                'capacity_lost_mw': p0['capacity_kw'] / 1000,
-                'customers_affected': p0['downstream_transformers'] * 50,
-                'substations': 1 if p0['node_type'] == 'SUBSTATION' else 0,
-                'transformers': 0 if p0['node_type'] == 'SUBSTATION' else 1
-            }}
-            
-            while queue and len(cascade_order) < max_nodes:
+            failed_ids = [patient_zero_id]
+            failed_waves = [0]
+            failed_triggers = [None]
+            failed_probs = [1.0]
+            failed_distances = [0.0]
+            
+            while queue and len(failed_ids) < max_nodes:
                 current_id, current_wave = queue.popleft()
                 
                 if current_wave >= max_waves:
@@ -5833,24 +5858,16 @@ async def simulate_cascade_realtime(
                 
                 current = nodes[current_id]
                 
-                for neighbor_id, distance in adjacency.get(current_id, []):
+                for neighbor_id, distance, distance_factor in adjacency.get(current_id, []):
                     if neighbor_id in visited:
                         continue
                     
                     neighbor = nodes[neighbor_id]
                     
                     # Calculate failure probability
-                    distance_factor = math.exp(-distance / 5.0)
                     source_effect = current['criticality_score']
                     target_vulnerability = neighbor['betweenness'] * 100 + 0.1
                     
-                    if temperature_c < 0:
-                        temp_stress = 1.0 + abs(temperature_c) / 20.0
-                    elif temperature_c > 35:
-                        temp_stress = 1.0 + (temperature_c - 35) / 15.0
-                    else:
-                        temp_stress = 1.0
-                    
                     fail_prob = min(0.95, 
                         distance_factor * 
                         source_effect * 
@@ -5862,44 +5879,58 @@ async def simulate_cascade_realtime(
                     
                     if fail_prob >= failure_threshold:
                         visited.add(neighbor_id)
-                        wave_num = current_wave + 1
-                        
-                        cascade_node = {
-                            **neighbor,
-                            'order': len(cascade_order),
-                            'wave_depth': wave_num,
-                            'triggered_by': current_id,
-                            'failure_probability': round(fail_prob, 3)
-                        }
-                        cascade_order.append(cascade_node)
-                        
-                        propagation_paths.append({
-                            'from_node': current_id,
-                            'to_node': neighbor_id,
-                            'order': len(cascade_order) - 1,
-                            'distance_km': round(distance, 2),
-                            'failure_probability': round(fail_prob, 3)
-                        })
-                        
-                        if wave_num not in wave_stats:
-                            wave_stats[wave_num] = {
-                                'wave_number': wave_num,
-                                'nodes_failed': 0,
-                                'capacity_lost_mw': 0,
-                                'customers_affected': 0,
-                                'substations': 0,
-                                'transformers': 0
-                            }
-                        
-                        wave_stats[wave_num]['nodes_failed'] += 1
-                        wave_stats[wave_num]['capacity_lost_mw'] += neighbor['capacity_kw'] / 1000
-                        wave_stats[wave_num]['customers_affected'] += neighbor['downstream_transformers'] * 50
-                        if neighbor['node_type'] == 'SUBSTATION':
-                            wave_stats[wave_num]['substations'] += 1
-                        else:
-                            wave_stats[wave_num]['transformers'] += 1
-                        
-                        queue.append((neighbor_id, wave_num))
+                        failed_ids.append(neighbor_id)
+                        failed_waves.append(current_wave + 1)
+                        failed_triggers.append(current_id)
+                        failed_probs.append(fail_prob)
+                        failed_distances.append(distance)
+                        queue.append((neighbor_id, current_wave + 1))
+            
+            # Expand the BFS record into cascade nodes, paths and wave stats
+            cascade_order = []
+            propagation_paths = []
+            wave_stats = {}
+            
+            for order, (node_id, wave_num, triggered_by, fail_prob, distance) in enumerate(zip(
+                failed_ids, failed_waves, failed_triggers, failed_probs, failed_distances
+            )):
+                node = nodes[node_id]
+                cascade_order.append({
+                    **node,
+                    'order': order,
+                    'wave_depth': wave_num,
+                    'triggered_by': triggered_by,
+                    'failure_probability': round(fail_prob, 3)
+                })
+                
+                if triggered_by is not None:
+                    propagation_paths.append({
+                        'from_node': triggered_by,
+                        'to_node': node_id,
+                        'order': order,
+                        'distance_km': round(distance, 2),
+                        'failure_probability': round(fail_prob, 3)
+                    })
+                
+                if wave_num not in wave_stats:
+                    wave_stats[wave_num] = {
+                        'wave_number': wave_num,
+                        'nodes_failed': 0,
+                        'capacity_lost_mw': 0,
+                        'customers_affected': 0,
+                        'substations': 0,
+                        'transformers': 0
+                    }
+                
+                wave_stats[wave_num]['nodes_failed'] += 1
+                wave_stats[wave_num]['capacity_lost_mw'] += node['capacity_kw'] / 1000
+                wave_stats[wave_num]['customers_affected'] += node['downstream_transformers'] * 50
+                if node['node_type'] == 'SUBSTATION':
+                    wave_stats[wave_num]['substations'] += 1
+                else:
+                    wave_stats[wave_num]['transformers'] += 1
+            
+            patient_zero = cascade_order[0]
             
             # Build final result
             return {